@@ -0,0 +1,60 @@
+"""
+Benchmark of startup of interpret.py with cold and warm program cache
+
+Every program is run without cache, then with an empty cache directory (cold, the program is compiled and
+stored) and then again with the same directory (warm, the program is loaded from cache). Programs start with
+EXIT, so only startup is measured.
+
+Usage: python3 bench/bench_cache.py [--sizes=1000,10000,100000] [--repeat=5]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+
+from bench_load import generate_lines
+from common import run_measured, interpret_cmd, xml_program
+
+
+def measure(cmd, repeat, before=None):
+    """
+    Function measuring median wall time of command
+    Input: command, number of runs, function called before every run
+    Return: median wall time in seconds
+    """
+    times = list()
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        result = run_measured(cmd)
+        if result['rc'] != 0:
+            sys.exit('interpret.py failed: ' + result['stderr'].decode())
+        times.append(result['wall'])
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold and warm startup benchmark of interpret.py')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='comma separated numbers of instructions')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs of every measurement')
+    arguments = parser.parse_args()
+
+    print('%12s %12s %12s %12s %8s' % ('instructions', 'no cache s', 'cold s', 'warm s', 'speedup'))
+    with tempfile.TemporaryDirectory() as directory:
+        cache_dir = os.path.join(directory, 'cache')
+        for size in map(int, arguments.sizes.split(',')):
+            source = os.path.join(directory, 'program%d.xml' % size)
+            with open(source, 'w') as file:
+                file.write(xml_program(generate_lines(size)))
+
+            cached = interpret_cmd(source, '--cache', '--cache-dir=' + cache_dir)
+            plain = measure(interpret_cmd(source), arguments.repeat)
+            cold = measure(cached, arguments.repeat, lambda: shutil.rmtree(cache_dir, ignore_errors=True))
+            warm = measure(cached, arguments.repeat)
+            print('%12d %12.3f %12.3f %12.3f %7.1fx' % (size, plain, cold, warm, plain / warm))
+
+
+if __name__ == '__main__':
+    main()
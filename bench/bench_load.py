@@ -0,0 +1,64 @@
+"""
+Benchmark of loading large XML programs by interpret.py
+
+Generates programs with given numbers of instructions and reports load time and peak RSS of interpret.py
+next to plain ElementTree.parse() of the same file and to loading the same program as IPPcode23 text by
+--source-format=ippcode. Programs start with EXIT, so only loading is measured.
+
+Usage: python3 bench/bench_load.py [--sizes=10000,100000,500000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from common import run_measured, interpret_cmd, ippcode_program, xml_program
+
+
+def generate_lines(size):
+    """
+    Function generating IPPcode23 program with given number of instructions
+    Input: number of instructions
+    Return: generator of lines
+    """
+    yield 'EXIT int@0'
+    yield 'DEFVAR GF@counter'
+    yield 'MOVE GF@counter int@0'
+    for i in range((size - 3) // 4):
+        yield 'LABEL block%d' % i
+        yield 'ADD GF@counter GF@counter int@%d' % i
+        yield 'WRITE string@line\\032number\\032%d\\010' % i
+        yield 'JUMPIFEQ block%d GF@counter int@-1' % i
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load time benchmark of interpret.py')
+    parser.add_argument('--sizes', default='10000,100000,500000', help='comma separated numbers of instructions')
+    arguments = parser.parse_args()
+
+    print('%12s %12s %10s %12s %10s %12s %10s %12s' % ('instructions', 'source MiB', 'load s', 'load RSS MiB',
+                                                      'ET.parse s', 'ET RSS MiB', 'text s', 'text RSS MiB'))
+    with tempfile.TemporaryDirectory() as directory:
+        for size in map(int, arguments.sizes.split(',')):
+            source = os.path.join(directory, 'program%d.xml' % size)
+            with open(source, 'w') as file:
+                file.write(xml_program(generate_lines(size)))
+            text_source = os.path.join(directory, 'program%d.ippcode' % size)
+            with open(text_source, 'w') as file:
+                file.write(ippcode_program(generate_lines(size)))
+
+            load = run_measured(interpret_cmd(source))
+            if load['rc'] != 0:
+                sys.exit('interpret.py failed: ' + load['stderr'].decode())
+            text = run_measured(interpret_cmd(text_source, '--source-format=ippcode'))
+            if text['rc'] != 0:
+                sys.exit('interpret.py failed: ' + text['stderr'].decode())
+            tree = run_measured([sys.executable, '-c', 'import sys, xml.etree.ElementTree as ET; ET.parse(sys.argv[1])',
+                                 source])
+            print('%12d %12.1f %10.3f %12.1f %10.3f %12.1f %10.3f %12.1f' % (
+                size, os.path.getsize(source) / 2 ** 20, load['wall'], load['rss'] / 1024,
+                tree['wall'], tree['rss'] / 1024, text['wall'], text['rss'] / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark of peephole optimization (--optimize=peephole)
+
+Runs all bundled tests from tests.zip with and without the optimization, checks that their output and return
+codes are the same and reports total wall time. Then runs a loop made of the fused idioms, where the difference
+is not hidden by startup of the interpreter.
+
+Usage: python3 bench/bench_peephole.py [--iterations=100000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import zipfile
+
+from common import ROOT, run_measured, interpret_cmd, xml_program
+
+IDIOMS = """DEFVAR GF@i
+MOVE GF@i int@0
+DEFVAR GF@c
+DEFVAR GF@s
+MOVE GF@s int@0
+JUMP loop
+LABEL add
+DEFVAR LF@tmp
+MOVE LF@tmp LF@x
+ADD GF@s GF@s LF@tmp
+RETURN
+LABEL loop
+PUSHS GF@i
+PUSHS int@3
+MULS
+PUSHS GF@s
+PUSHS int@1
+ADDS
+POPS GF@s
+POPS GF@c
+CREATEFRAME
+DEFVAR TF@x
+MOVE TF@x GF@c
+PUSHFRAME
+CALL add
+POPFRAME
+ADD GF@i GF@i int@1
+LT GF@c GF@i int@{iterations}
+JUMPIFEQ loop GF@c bool@true
+WRITE GF@s"""
+
+
+def run_tests(directory, options):
+    """
+    Function running all tests in directory
+    Input: directory with tests, options of interpret.py
+    Return: touple of total wall time and dictionary of results of tests
+    """
+    total = 0.0
+    results = dict()
+    for path, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.endswith('.src'):
+                source = os.path.join(path, name)
+                result = run_measured(interpret_cmd(source, *options))
+                total += result['wall']
+                results[source] = (result['rc'], result['stdout'])
+    return total, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of peephole optimization')
+    parser.add_argument('--iterations', type=int, default=100000, help='iterations of the idiom loop')
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        with zipfile.ZipFile(os.path.join(ROOT, 'tests.zip')) as tests:
+            tests.extractall(directory)
+        plain, plain_results = run_tests(directory, ())
+        optimized, optimized_results = run_tests(directory, ('--optimize=peephole',))
+        different = [source for source in plain_results if plain_results[source] != optimized_results[source]]
+        print('bundled tests: %d, different results: %d' % (len(plain_results), len(different)))
+        print('bundled tests: %.3f s without, %.3f s with peephole (%.2fx)' % (plain, optimized, plain / optimized))
+
+        source = os.path.join(directory, 'idioms.xml')
+        with open(source, 'w') as file:
+            file.write(xml_program(IDIOMS.format(iterations=arguments.iterations).splitlines()))
+        plain = run_measured(interpret_cmd(source))
+        optimized = run_measured(interpret_cmd(source, '--optimize=peephole'))
+        if plain['stdout'] != optimized['stdout'] or plain['rc'] != optimized['rc']:
+            different.append(source)
+        print('idiom loop: %.3f s without, %.3f s with peephole (%.2fx)' % (
+            plain['wall'], optimized['wall'], plain['wall'] / optimized['wall']))
+    if different:
+        sys.exit('different results: ' + ', '.join(different))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Latency benchmark of the daemon of interpret.py
+
+Starts interpret.py --serve on a temporary socket and runs small programs repeatedly by the cold command line,
+by the thin client interpret_client.py and by requests sent right from this script (latency of the daemon alone
+without starting the client). Output of every run is checked against the cold run. Reports median and 95th
+percentile of wall time in milliseconds.
+
+Usage: python3 bench/bench_serve.py [--repeat=30] [--programs=hello,fib]
+"""
+import argparse
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT, interpret_cmd, run_measured, xml_program
+
+CLIENT = os.path.join(ROOT, 'interpret_client.py')
+
+
+def program_source(name, directory):
+    """
+    Function giving path of a program, hello is generated and the others are from bench/programs
+    Input: name of program, directory for generated programs
+    Return: path of XML source
+    """
+    if name != 'hello':
+        return os.path.join(ROOT, 'bench', 'programs', name + '.xml')
+    source = os.path.join(directory, 'hello.xml')
+    with open(source, 'w') as file:
+        file.write(xml_program(['DEFVAR GF@x', 'MOVE GF@x string@hello\\032world', 'WRITE GF@x']))
+    return source
+
+
+def direct_request(path, source):
+    """
+    Function running a program by the daemon without the client
+    Input: path of socket, path of XML source
+    Return: output as bytes
+    """
+    header = json.dumps({'options': [], 'source': source, 'input': os.devnull}).encode()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        connection.sendall(b''.join(struct.pack('>Q', len(frame)) + frame for frame in (header, b'', b'')))
+        stream = connection.makefile('rb')
+        frames = list()
+        for _ in range(3):
+            size, = struct.unpack('>Q', stream.read(8))
+            frames.append(stream.read(size))
+    return frames[1]
+
+
+def percentiles(times):
+    """
+    Function computing median and 95th percentile
+    Input: list of times in seconds
+    Return: touple of both in milliseconds
+    """
+    times = sorted(times)
+    return 1000 * times[len(times) // 2], 1000 * times[min(len(times) - 1, int(len(times) * 0.95))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latency benchmark of the daemon of interpret.py')
+    parser.add_argument('--repeat', type=int, default=30, help='number of runs of every program in every mode')
+    parser.add_argument('--programs', default='hello,fib', help='comma separated names of programs')
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'interpret.sock')
+        daemon = subprocess.Popen([sys.executable, os.path.join(ROOT, 'interpret.py'), '--serve=' + path])
+        try:
+            while not os.path.exists(path):
+                time.sleep(0.01)
+            print('%-10s %-8s %10s %10s' % ('program', 'mode', 'p50 ms', 'p95 ms'))
+            for name in arguments.programs.split(','):
+                source = program_source(name, directory)
+                expected = run_measured(interpret_cmd(source))['stdout']
+                modes = {
+                    'cold': lambda: run_measured(interpret_cmd(source)),
+                    'client': lambda: run_measured([sys.executable, CLIENT, '--socket=' + path,
+                                                    '--source=' + source, '--input=' + os.devnull]),
+                    'direct': lambda: {'stdout': direct_request(path, source)},
+                }
+                for mode, run in modes.items():
+                    times = list()
+                    for _ in range(arguments.repeat):
+                        start = time.perf_counter()
+                        result = run()
+                        times.append(time.perf_counter() - start)
+                        if result['stdout'] != expected:
+                            sys.exit('%s: wrong output of %s: %r' % (name, mode, result['stdout'][:200]))
+                    print('%-10s %-8s %10.1f %10.1f' % (name, mode, *percentiles(times)))
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark suite of interpret.py on IPPcode23 programs in bench/programs
+
+Every program is run several times and the fastest run is reported with its instructions per second (executed
+instructions are counted once by --stats --insts), wall time and peak RSS. Output of every run is checked against
+the .out file of the program. Results are compared with a stored baseline and slower programs are flagged as
+regressions, the exit code is then 1.
+
+Usage: python3 bench/bench_suite.py [--repeat=3] [--only=fib,strings] [--options="--optimize=fold"]
+                                    [--baseline=bench/baseline.json] [--threshold=10] [--save]
+"""
+import argparse
+import json
+import os
+import shlex
+import sys
+import tempfile
+
+from common import ROOT, INTERPRET, run_measured
+
+PROGRAMS = os.path.join(ROOT, 'bench', 'programs')
+BASELINE = os.path.join(ROOT, 'bench', 'baseline.json')
+
+
+def program_input(name):
+    """
+    Function generating standard input of a program, programs without READ get empty input
+    Input: name of program
+    Return: bytes
+    """
+    if name == 'read':
+        return ''.join('%d\nword%d\n' % (i, i % 977) for i in range(40000)).encode()
+    return b''
+
+
+def count_instructions(source, stdin_data, options):
+    """
+    Function counting executed instructions of a program by statistic --insts
+    Input: path of XML source, standard input, options of interpret.py
+    Return: number of instructions
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        stats = os.path.join(directory, 'insts')
+        result = run_measured([sys.executable, INTERPRET, '--source=' + source, *options,
+                               '--stats=' + stats, '--insts'], stdin_data)
+        if result['rc'] != 0:
+            sys.exit('%s failed with %d: %s' % (source, result['rc'], result['stderr'].decode()))
+        with open(stats) as file:
+            return int(file.read())
+
+
+def measure(name, repeat, options):
+    """
+    Function running one program and checking its output
+    Input: name of program, number of runs, options of interpret.py
+    Return: dictionary with number of instructions, wall time of the fastest run, instructions per second and
+    peak RSS in KiB
+    """
+    source = os.path.join(PROGRAMS, name + '.xml')
+    with open(os.path.join(PROGRAMS, name + '.out'), 'rb') as file:
+        expected = file.read()
+    stdin_data = program_input(name)
+    # Input comes from stdin, the program is given by --source
+    cmd = [sys.executable, INTERPRET, '--source=' + source, *options]
+
+    runs = list()
+    for _ in range(repeat):
+        result = run_measured(cmd, stdin_data)
+        if result['rc'] != 0 or result['stdout'] != expected:
+            sys.exit('%s: wrong result, return code %d, output %r' % (name, result['rc'], result['stdout'][:200]))
+        runs.append(result)
+    wall = min(run['wall'] for run in runs)
+    instructions = count_instructions(source, stdin_data, [option for option in options
+                                                           if not option.startswith('--optimize')])
+    return {'instructions': instructions, 'wall': wall, 'ips': instructions / wall,
+            'rss': max(run['rss'] for run in runs)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite of interpret.py')
+    parser.add_argument('--repeat', type=int, default=3, help='number of runs of every program')
+    parser.add_argument('--only', help='comma separated names of programs')
+    parser.add_argument('--options', type=shlex.split, default=[], help='options of interpret.py')
+    parser.add_argument('--baseline', default=BASELINE, help='JSON file with baseline results')
+    parser.add_argument('--threshold', type=float, default=10, help='slowdown in percent flagged as regression')
+    parser.add_argument('--save', action='store_true', help='store results as the new baseline')
+    arguments = parser.parse_args()
+
+    names = sorted(file[:-4] for file in os.listdir(PROGRAMS) if file.endswith('.xml'))
+    if arguments.only:
+        names = [name for name in names if name in arguments.only.split(',')]
+    baseline = dict()
+    if os.path.exists(arguments.baseline) and not arguments.save:
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+
+    print('%-10s %12s %9s %12s %9s %9s' % ('program', 'instructions', 'wall s', 'inst/s', 'RSS MiB', 'baseline'))
+    results = dict()
+    regressions = 0
+    for name in names:
+        result = measure(name, arguments.repeat, arguments.options)
+        results[name] = result
+        comparison = ''
+        if name in baseline:
+            change = 100 * (result['wall'] / baseline[name]['wall'] - 1)
+            comparison = '%+8.1f%%' % change
+            if change > arguments.threshold:
+                comparison += ' REGRESSION'
+                regressions += 1
+        print('%-10s %12d %9.3f %12.0f %9.1f %s' % (name, result['instructions'], result['wall'], result['ips'],
+                                                   result['rss'] / 1024, comparison))
+
+    if arguments.save:
+        with open(arguments.baseline, 'w') as file:
+            json.dump(results, file, indent=1, sort_keys=True)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
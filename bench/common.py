@@ -0,0 +1,90 @@
+"""
+Helpers shared by benchmarks of interpret.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from xml.sax.saxutils import escape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INTERPRET = os.path.join(ROOT, 'interpret.py')
+
+# Positions of label and type operands, all other operands are var or symb
+LABEL_FIRST = ('LABEL', 'JUMP', 'CALL', 'JUMPIFEQ', 'JUMPIFNEQ', 'JUMPIFEQS', 'JUMPIFNEQS')
+
+
+def xml_argument(opcode, position, text):
+    """
+    Function converting one IPPcode23 operand to its type and value in XML
+    Input: OPCODE, position of operand, operand text
+    Return: touple of type and value
+    """
+    if position == 1 and opcode in LABEL_FIRST:
+        return 'label', text
+    if position == 2 and opcode == 'READ':
+        return 'type', text
+    prefix, value = text.split('@', 1)
+    if prefix in ('GF', 'LF', 'TF'):
+        return 'var', text
+    return prefix, value
+
+
+def xml_program(lines):
+    """
+    Function converting IPPcode23 instructions, one per line without header and comments, to XML source
+    Input: iterable of lines
+    Return: XML source as string
+    """
+    out = ['<?xml version="1.0" encoding="UTF-8"?>', '<program language="IPPcode23">']
+    for order, line in enumerate(lines, 1):
+        opcode, *operands = line.split()
+        opcode = opcode.upper()
+        out.append('<instruction order="%d" opcode="%s">' % (order, opcode))
+        for position, text in enumerate(operands, 1):
+            arg_type, value = xml_argument(opcode, position, text)
+            out.append('<arg%d type="%s">%s</arg%d>' % (position, arg_type, escape(value), position))
+        out.append('</instruction>')
+    out.append('</program>')
+    return '\n'.join(out) + '\n'
+
+
+def ippcode_program(lines):
+    """
+    Function joining IPPcode23 instructions, one per line, to IPPcode23 source with header
+    Input: iterable of lines
+    Return: IPPcode23 source as string
+    """
+    return '.IPPcode23\n' + '\n'.join(lines) + '\n'
+
+
+def run_measured(cmd, stdin_data=b''):
+    """
+    Function running command and measuring its wall time and peak memory
+    Input: command as list, data for standard input
+    Return: dictionary with wall time in seconds, peak RSS in KiB, return code, standard output and error
+    """
+    with tempfile.TemporaryFile() as stdin, tempfile.TemporaryFile() as stdout, \
+            tempfile.TemporaryFile() as stderr:
+        stdin.write(stdin_data)
+        stdin.seek(0)
+        start = time.perf_counter()
+        process = subprocess.Popen(cmd, stdin=stdin, stdout=stdout, stderr=stderr)
+        # wait4() reaps the process and returns resource usage of this process only
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        stdout.seek(0)
+        stderr.seek(0)
+        return {'wall': wall, 'rss': usage.ru_maxrss, 'rc': process.returncode,
+                'stdout': stdout.read(), 'stderr': stderr.read()}
+
+
+def interpret_cmd(source, *options, input_file=os.devnull):
+    """
+    Function building command running interpret.py
+    Input: path of XML source, additional options, input file
+    Return: command as list
+    """
+    return [sys.executable, INTERPRET, '--source=' + source, '--input=' + input_file, *options]
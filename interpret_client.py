@@ -0,0 +1,104 @@
+"""
+Thin client of the daemon started by interpret.py --serve=/path.sock
+
+Sends the program (its path or source from stdin), the input (its path or stdin) and all other options
+of interpret.py to the daemon, then writes output and errors of the run and exits with its return code. It only
+imports modules needed to talk to the socket, so it starts faster than interpret.py.
+
+Usage: python3 interpret_client.py --socket=/path.sock [--source=file] [--input=file] [options of interpret.py]
+Values of options can also be given as the next argument, e.g. --source file
+"""
+import json
+import os
+import socket
+import struct
+import sys
+
+# Options of interpret.py naming files, they are sent as absolute paths, because the daemon runs in other directory
+PATH_OPTIONS = ('--stats', '--profile', '--adaptive-stats', '--cache-dir')
+# Options of the client, not sent as options
+CLIENT_OPTIONS = ('--socket', '--source', '--input')
+
+
+def read_frames(connection, count):
+    """
+    Function reading frames of the daemon protocol, every frame is 8 bytes of its length and its bytes
+    Input: connected socket, number of frames
+    Return: list of bytes
+    """
+    stream = connection.makefile('rb')
+    frames = list()
+    for _ in range(count):
+        head = stream.read(8)
+        if len(head) != 8:
+            raise ConnectionError('connection closed')
+        size, = struct.unpack('>Q', head)
+        frames.append(stream.read(size))
+        if len(frames[-1]) != size:
+            raise ConnectionError('connection closed')
+    return frames
+
+
+def request(path, options, source, input_file):
+    """
+    Function sending one run to the daemon
+    Input: path of socket, options of interpret.py, path of source or None, path of input or None, missing paths
+    are read from stdin
+    Return: touple of return code, output and errors as bytes
+    """
+    header = {'options': options, 'source': source, 'input': input_file}
+    source_data = sys.stdin.buffer.read() if source is None else b''
+    input_data = sys.stdin.buffer.read() if input_file is None else b''
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        connection.sendall(b''.join(struct.pack('>Q', len(frame)) + frame
+                                    for frame in (json.dumps(header).encode(), source_data, input_data)))
+        response, output, errors = read_frames(connection, 3)
+    return json.loads(response)['code'], output, errors
+
+
+def usage_error():
+    """
+    Function ending the client with error 10 of wrong arguments
+    """
+    sys.stderr.write('Error 10: Wrong script argument/usage\n')
+    sys.exit(10)
+
+
+def main():
+    path = source = input_file = None
+    options = list()
+    arguments = iter(sys.argv[1:])
+    for argument in arguments:
+        name, equals, value = argument.partition('=')
+        if not equals and (name in CLIENT_OPTIONS or name in PATH_OPTIONS):
+            # Value of the option given as the next argument
+            value = next(arguments, None)
+            if value is None:
+                usage_error()
+        if name == '--socket':
+            path = value
+        elif name == '--source':
+            source = os.path.abspath(value)
+        elif name == '--input':
+            input_file = os.path.abspath(value)
+        elif name in PATH_OPTIONS:
+            options.append(name + '=' + os.path.abspath(value))
+        else:
+            options.append(argument)
+    if path is None or (source is None and input_file is None):
+        usage_error()
+
+    try:
+        code, output, errors = request(path, options, source, input_file)
+    except (OSError, ValueError) as error:
+        sys.stderr.write('Error 99: Daemon on %s failed: %s\n' % (path, error))
+        sys.exit(99)
+    sys.stdout.buffer.write(output)
+    sys.stdout.flush()
+    sys.stderr.buffer.write(errors)
+    sys.exit(code)
+
+
+if __name__ == '__main__':
+    main()
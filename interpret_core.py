@@ -0,0 +1,3253 @@
+import argparse  # command-line argument handling
+import gc
+import io
+import locale
+import mmap
+import operator
+import os
+import sys
+import re
+import signal
+import stat
+import time
+import xml.etree.ElementTree as ET
+from contextlib import redirect_stderr
+from functools import partial
+from itertools import chain, repeat
+
+# Library interface, names imported by interpret.py
+__all__ = ['compile_program', 'execute', 'main', 'argument_parse', 'Program', 'ProgramExit', 'Limits', 'InputReader',
+           'ENGINES', 'OPTIMIZATIONS']
+
+# Kinds of operands expected by each OPCODE
+OPERANDS = {
+    'MOVE': ('var', 'symb'), 'CREATEFRAME': (), 'PUSHFRAME': (), 'POPFRAME': (), 'DEFVAR': ('var',),
+    'CALL': ('label',), 'RETURN': (),
+    'PUSHS': ('symb',), 'POPS': ('var',),
+    'ADD': ('var', 'symb', 'symb'), 'SUB': ('var', 'symb', 'symb'), 'MUL': ('var', 'symb', 'symb'),
+    'IDIV': ('var', 'symb', 'symb'), 'DIV': ('var', 'symb', 'symb'),
+    'ADDS': (), 'SUBS': (), 'MULS': (), 'IDIVS': (),
+    'LT': ('var', 'symb', 'symb'), 'GT': ('var', 'symb', 'symb'), 'EQ': ('var', 'symb', 'symb'),
+    'AND': ('var', 'symb', 'symb'), 'OR': ('var', 'symb', 'symb'), 'NOT': ('var', 'symb'),
+    'LTS': (), 'GTS': (), 'EQS': (), 'ANDS': (), 'ORS': (), 'NOTS': (),
+    'INT2CHAR': ('var', 'symb'), 'STRI2INT': ('var', 'symb', 'symb'), 'INT2CHARS': (), 'STRI2INTS': (),
+    'INT2FLOAT': ('var', 'symb'), 'FLOAT2INT': ('var', 'symb'),
+    'READ': ('var', 'type'), 'WRITE': ('symb',),
+    'CONCAT': ('var', 'symb', 'symb'), 'STRLEN': ('var', 'symb'), 'GETCHAR': ('var', 'symb', 'symb'),
+    'SETCHAR': ('var', 'symb', 'symb'), 'TYPE': ('var', 'symb'),
+    'LABEL': ('label',), 'JUMP': ('label',), 'JUMPIFEQ': ('label', 'symb', 'symb'),
+    'JUMPIFNEQ': ('label', 'symb', 'symb'), 'JUMPIFEQS': ('label',), 'JUMPIFNEQS': ('label',),
+    'EXIT': ('symb',), 'DPRINT': ('symb',), 'BREAK': (), 'CLEARS': (),
+}
+
+# Escape sequence of a character in string literal
+ESCAPE = re.compile(r'\\([0-9]{3})')
+
+# Default directory of compiled programs and header of their files
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'ipp-interpret')
+CACHE_MAGIC = b'IPPC\x01'
+
+# Seconds the daemon waits for the request of a connected client, so a stalled client doesn't block others
+REQUEST_TIMEOUT = 5
+
+# Optional optimizations of program
+OPTIMIZATIONS = ('peephole', 'fold', 'types')
+
+# OPCODEs with label as the first operand, except LABEL
+BRANCHES = ('CALL', 'JUMP', 'JUMPIFEQ', 'JUMPIFNEQ', 'JUMPIFEQS', 'JUMPIFNEQS')
+# OPCODEs computed from constant operands by fold_value()
+FOLDABLE = ('ADD', 'SUB', 'MUL', 'IDIV', 'DIV', 'LT', 'GT', 'EQ', 'AND', 'OR', 'NOT', 'INT2CHAR', 'STRLEN', 'CONCAT')
+# OPCODEs with handler without checks of operand types used when infer_types() proves the types
+TYPED = ('ADD', 'SUB', 'MUL', 'IDIV', 'DIV', 'LT', 'GT', 'EQ', 'AND', 'OR', 'NOT', 'JUMPIFEQ', 'JUMPIFNEQ', 'CONCAT',
+         'STRLEN')
+# Type of the var written by an instruction that doesn't depend on operands
+RESULT_TYPES = {
+    'LT': 'bool', 'GT': 'bool', 'EQ': 'bool', 'AND': 'bool', 'OR': 'bool', 'NOT': 'bool',
+    'INT2CHAR': 'string', 'STRI2INT': 'int', 'INT2FLOAT': 'float', 'FLOAT2INT': 'int',
+    'CONCAT': 'string', 'STRLEN': 'int', 'GETCHAR': 'string', 'SETCHAR': 'string', 'TYPE': 'string',
+}
+# OPCODEs that engine adaptive specializes to types of operands seen at run time
+QUICKENED = ('ADD', 'SUB', 'MUL', 'IDIV', 'DIV', 'LT', 'GT', 'EQ', 'AND', 'OR', 'JUMPIFEQ', 'JUMPIFNEQ')
+# Short names of types in names of specialized handlers
+TYPE_NAMES = {'int': 'INT', 'float': 'FLOAT', 'string': 'STR', 'bool': 'BOOL', 'nil': 'NIL'}
+# Operations of typed and specialized handlers
+OPERATIONS = {
+    'ADD': operator.add, 'SUB': operator.sub, 'MUL': operator.mul, 'IDIV': operator.floordiv, 'DIV': operator.truediv,
+    'LT': operator.lt, 'GT': operator.gt, 'EQ': operator.eq, 'AND': operator.and_, 'OR': operator.or_,
+}
+
+# Method of class Instruction executing each OPCODE with its stack_flag
+HANDLERS = {
+    'MOVE': ('move',), 'CREATEFRAME': ('createframe',), 'PUSHFRAME': ('pushframe',), 'POPFRAME': ('popframe',),
+    'DEFVAR': ('defvar',), 'CALL': ('call',), 'RETURN': ('return_ins',),
+    'PUSHS': ('pushs',), 'POPS': ('pops',),
+    'ADD': ('add_sub_mul_idiv', 1), 'SUB': ('add_sub_mul_idiv', 1), 'MUL': ('add_sub_mul_idiv', 1),
+    'IDIV': ('add_sub_mul_idiv', 1), 'DIV': ('add_sub_mul_idiv', 1),
+    'ADDS': ('add_sub_mul_idiv', 0), 'SUBS': ('add_sub_mul_idiv', 0), 'MULS': ('add_sub_mul_idiv', 0),
+    'IDIVS': ('add_sub_mul_idiv', 0),
+    'LT': ('lt_gt_eq_and_or', 1), 'GT': ('lt_gt_eq_and_or', 1), 'EQ': ('lt_gt_eq_and_or', 1),
+    'AND': ('lt_gt_eq_and_or', 1), 'OR': ('lt_gt_eq_and_or', 1), 'NOT': ('not_ins', 1),
+    'LTS': ('lt_gt_eq_and_or', 0), 'GTS': ('lt_gt_eq_and_or', 0), 'EQS': ('lt_gt_eq_and_or', 0),
+    'ANDS': ('lt_gt_eq_and_or', 0), 'ORS': ('lt_gt_eq_and_or', 0), 'NOTS': ('not_ins', 0),
+    'INT2CHAR': ('int2char', 1), 'STRI2INT': ('stri2int', 1), 'INT2CHARS': ('int2char', 0),
+    'STRI2INTS': ('stri2int', 0), 'INT2FLOAT': ('int2float',), 'FLOAT2INT': ('float2int',),
+    'READ': ('read',), 'WRITE': ('write',),
+    'CONCAT': ('concat',), 'STRLEN': ('strlen',), 'GETCHAR': ('getchar',), 'SETCHAR': ('setchar',),
+    'TYPE': ('type_inst',),
+    'LABEL': ('label',), 'JUMP': ('jump',), 'JUMPIFEQ': ('jumpif', 1), 'JUMPIFNEQ': ('jumpif', 1),
+    'JUMPIFEQS': ('jumpif', 0), 'JUMPIFNEQS': ('jumpif', 0),
+    'EXIT': ('exit_inst',), 'DPRINT': ('dprint',), 'BREAK': ('break_inst',), 'CLEARS': ('clears',),
+}
+
+
+class StatsAction(argparse.Action):
+    """
+    Collects groups of statistics, every statistic belongs to the group of the last --stats=file before it
+    """
+    def __call__(self, parser, namespace, values, option_string=None):
+        if namespace.stats is None:
+            namespace.stats = list()
+        if self.const == 'file':
+            namespace.stats.append((values, list()))
+            return
+        if not namespace.stats:
+            error_exit(10, "Error 10: Statistics without --stats")
+        namespace.stats[-1][1].append((self.const, values))
+
+
+def optimize_list(text):
+    """
+    Function parsing comma separated list of optimizations
+    Input: string
+    Return: touple of names from OPTIMIZATIONS
+    """
+    names = tuple(name for name in text.split(',') if name)
+    for name in names:
+        if name not in OPTIMIZATIONS:
+            raise argparse.ArgumentTypeError("unknown optimization " + name)
+    return names
+
+
+def argument_parse(argv=None):
+    """
+    Function parsing arguments from commandline or from given list of arguments
+    Return: namespace with source, its format, input, engine, size of output buffer, program cache options, groups
+    of statistics, profiler options, report of engine adaptive, limits, optimizations, dump modes and daemon options
+    """
+    parser = argparse.ArgumentParser(description='interpret.py ')
+    # --source and --serve are also names of their own, so --source=file isn't an ambiguous prefix of --source-format=
+    parser.add_argument('--source=', '--source', action='store', dest='src', nargs='?')
+    parser.add_argument('--input=', action='store', dest='inp', nargs='?')
+    parser.add_argument('--source-format=', action='store', dest='source_format', choices=SOURCE_FORMATS,
+                        default='xml')
+    parser.add_argument('--stats=', action=StatsAction, dest='stats', const='file')
+    for statistic in ('insts', 'hot', 'vars', 'frequent', 'eol'):
+        parser.add_argument('--' + statistic, action=StatsAction, dest='stats', const=statistic, nargs=0)
+    parser.add_argument('--print=', action=StatsAction, dest='stats', const='print')
+    parser.add_argument('--optimize=', action='store', dest='optimize', type=optimize_list, default=())
+    parser.add_argument('--dump', action='store_true', dest='dump')
+    parser.add_argument('--profile', action='store', dest='profile')
+    parser.add_argument('--profile-sample', action='store', dest='profile_sample', type=int, default=0)
+    parser.add_argument('--adaptive-stats=', action='store', dest='adaptive_stats')
+    parser.add_argument('--engine=', action='store', dest='engine', choices=ENGINES, default='table')
+    parser.add_argument('--compile=', action='store', dest='engine', choices=('python',))
+    parser.add_argument('--dump-python', action='store_true', dest='dump_python')
+    parser.add_argument('--output-buffer=', action='store', dest='output_buffer', type=int, default=1 << 20)
+    parser.add_argument('--cache', action=argparse.BooleanOptionalAction, dest='cache', default=False)
+    parser.add_argument('--cache-dir=', action='store', dest='cache_dir', default=CACHE_DIR)
+    parser.add_argument('--max-steps=', action='store', dest='max_steps', type=int)
+    parser.add_argument('--max-memory=', action='store', dest='max_memory', type=int)
+    parser.add_argument('--timeout=', action='store', dest='timeout', type=float)
+    parser.add_argument('--serve=', '--serve', action='store', dest='serve')
+    parser.add_argument('--serve-memory=', action='store', dest='serve_memory', type=int, default=256)
+    arguments = parser.parse_args(argv)
+    if arguments.serve is None and arguments.inp is None and arguments.src is None:
+        error_exit(10, "Error 10: Wrong script argument/usage")
+    if arguments.stats and len({file for file, _ in arguments.stats}) != len(arguments.stats):
+        error_exit(12, "Error 12: Statistics written twice to the same file")
+    if arguments.profile is not None and arguments.stats:
+        error_exit(10, "Error 10: --profile can't be combined with --stats")
+    if arguments.adaptive_stats is not None and arguments.engine != 'adaptive':
+        error_exit(10, "Error 10: --adaptive-stats needs --engine=adaptive")
+    limits = (arguments.max_steps, arguments.max_memory, arguments.timeout)
+    if any(limit is not None and limit <= 0 for limit in limits):
+        error_exit(10, "Error 10: Limits must be positive")
+    if limits != (None, None, None) and (arguments.stats or arguments.profile is not None):
+        error_exit(10, "Error 10: Limits can't be combined with --stats or --profile")
+    return arguments
+
+
+def xml_load(source):
+    """
+    Function parsing XML source in one pass, checking XML structures and their validity and building
+    instructions. Elements are cleared as soon as their instruction is built
+    Input: binary file with XML source
+    Return: list of Instructions sorted by ORDER
+    """
+    instruction_list = list()
+    orders = list()
+    error = None  # First error in XML structures, reported after whole source is parsed
+
+    depth = 0
+    root = None
+    try:
+        for event, elem in ET.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if depth == 1:
+                    root = elem
+                    # Check if program tag exists and language attribute
+                    if root.tag != 'program':
+                        error = error or "Error 32: Wrong root tag"
+                    elif root.get('language') is None or root.get('language').lower() != "ippcode23":
+                        error = error or "Error 32: Wrong XML format"
+                continue
+
+            depth -= 1
+            if depth != 1:
+                continue
+
+            # Check instruction tag, ORDER and OPCODE
+            order = elem.get('order')
+            opcode = elem.get('opcode')
+            if order is None or opcode is None:
+                error = error or "Error 32: Missing ORDER of OPCODE"
+            elif elem.tag != 'instruction':
+                error = error or "Error 32: Wrong XML format - instruction tag"
+            else:
+                try:
+                    order = int(order)
+                except ValueError:
+                    error = error or "Error 32: Order error"
+
+            # Check if arguments have correct tags
+            args = list()
+            for argum in elem:
+                if argum.tag not in ('arg1', 'arg2', 'arg3'):
+                    error = error or "Error 32: Unknown tag"
+                # Check if type attribute exists
+                if 'type' not in argum.attrib: error = error or "Error 31: Wrong XML file format (no type in arg)"
+                args.append((argum.tag, argum.get('type'), argum.text))
+            tags = {tag for tag, _, _ in args}
+            if 'arg2' in tags and 'arg1' not in tags: error = error or "Error 32: XML arg2 without arg1"
+            if 'arg3' in tags and ('arg1' not in tags or 'arg2' not in tags):
+                error = error or "Error 32: XML arg2 without arg1"
+
+            if error is None:
+                instruct = Instruction(order, opcode.upper())
+                for _, arg_type, value in sorted(args, key=lambda arg: arg[0]):
+                    instruct.add_argument(arg_type, value)
+                instruction_list.append(instruct)
+                orders.append(order)
+            # Drop parsed instruction from the tree
+            elem.clear()
+            root.clear()
+    except ET.ParseError:
+        error_exit(31, "Error 31: Wrong xml format")
+    if error is not None:
+        error_exit(32, error)
+
+    # Sort instructions by ORDER and check that all orders are positive and unique
+    index = sorted(range(len(orders)), key=orders.__getitem__)
+    previous = 0
+    for i in index:
+        if orders[i] <= previous: error_exit(32, 'Error 32: (XML Check) Wrong XML instruction order')
+        previous = orders[i]
+    return [instruction_list[i] for i in index]
+
+
+def ippcode_load(source):
+    """
+    Function parsing IPPcode23 source text line by line into the same instructions as xml_load() builds, ORDER
+    is the number of the instruction. Comments start with #, operands are typed by their prefix or by the kind
+    of operand the OPCODE expects (label and type), their values are checked later by compile_args() as in XML
+    Input: binary file with IPPcode23 source
+    Return: list of Instructions
+    """
+    try:
+        lines = source.read().decode('utf-8').splitlines()
+    except UnicodeDecodeError:
+        error_exit(31, "Error 31: Wrong source encoding")
+
+    instruction_list = list()
+    header = False
+    for line in lines:
+        tokens = line.partition('#')[0].split()
+        if not tokens:
+            continue
+        # First line with code is the header
+        if not header:
+            if len(tokens) != 1 or tokens[0].lower() != '.ippcode23':
+                error_exit(32, "Error 32: Wrong or missing header .IPPcode23")
+            header = True
+            continue
+
+        opcode = tokens[0].upper()
+        instruct = Instruction(len(instruction_list) + 1, opcode)
+        # Unknown OPCODE is an error only when it's executed, its operands are never used
+        if opcode not in OPERANDS:
+            instruction_list.append(instruct)
+            continue
+        for token, kind in zip(tokens[1:], OPERANDS[opcode] + (None,) * (len(tokens) - 1)):
+            if kind in ('label', 'type'):
+                instruct.add_argument(kind, token)
+                continue
+            prefix, at, value = token.partition('@')
+            if not at:
+                error_exit(32, "Error 32: Wrong operand " + token)
+            if prefix in ('GF', 'LF', 'TF'):
+                instruct.add_argument('var', token)
+            else:
+                instruct.add_argument(prefix, value)
+        instruction_list.append(instruct)
+    if not header:
+        error_exit(32, "Error 32: Wrong or missing header .IPPcode23")
+    return instruction_list
+
+
+# Loaders of source formats selected by --source-format
+SOURCE_FORMATS = {
+    'xml': xml_load,
+    'ippcode': ippcode_load,
+}
+
+
+def decode_escapes(text):
+    """
+    Function replacing escape sequences \\ddd in string literal with their characters
+    Input: string
+    Return: decoded string
+    """
+    return ESCAPE.sub(lambda match: chr(int(match.group(1))), text)
+
+
+def compile_arg(arg, kind):
+    """
+    Function resolving one XML argument into an immutable typed constant with native value or a variable reference
+    Input: Variable with raw XML type and text, expected operand kind
+    Return: resolved Variable
+    """
+    if arg.type not in ('int', 'bool', 'string', 'nil', 'label', 'type', 'var', 'float'):
+        error_exit(32, "Error 32: Wrong XML formatting")
+
+    # Check that operand kind fits the instruction
+    if kind in ('var', 'label', 'type') and arg.type != kind:
+        error_exit(53, "Error 53: Wrong argument type given")
+    if kind == 'symb' and arg.type in ('label', 'type'):
+        error_exit(53, "Error 53: Wrong argument type given")
+
+    match arg.type:
+        case 'var':
+            if arg.value is None or '@' not in arg.value:
+                error_exit(32, "Error 32: Wrong XML formatting")
+            # Unknown frames of a target var are reported as error 55 when executed
+            if kind != 'var' and not re.match(r'^(GF|TF|LF)@\S+$', arg.value):
+                error_exit(32, "Error 32: Wrong XML formatting")
+            return Reference(arg.value)
+        case 'int':
+            try:
+                return Variable('int', int(arg.value))
+            except (ValueError, TypeError):
+                error_exit(32, "Error 32: Wrong value")
+        case 'float':
+            try:
+                return Variable('float', float.fromhex(arg.value))
+            except (ValueError, TypeError):
+                error_exit(32, "Error 32: Wrong value")
+        case 'string':
+            return Variable('string', '' if arg.value is None else decode_escapes(arg.value))
+        case 'label':
+            return Label(arg.value)
+        case 'bool':
+            if arg.value not in ('true', 'false'): error_exit(32, "Error 32: Wrong value")
+            return TRUE if arg.value == 'true' else FALSE
+        case 'nil':
+            if arg.value != 'nil': error_exit(32, "Error 32: Wrong value")
+            return NIL
+    return arg
+
+
+def compile_args(instruction_list):
+    """
+    Function checking number of arguments and replacing arguments of all instructions with resolved operands,
+    so they are not parsed again during execution. Unknown OPCODE is an error only when it's executed, so its
+    instruction stays in the program without operands
+    Input: list of Instructions
+    """
+    for instruct in instruction_list:
+        if instruct.opcode not in OPERANDS:
+            instruct.args = []
+            continue
+        kinds = OPERANDS[instruct.opcode]
+        instruct.check_arg_num(len(kinds))
+        instruct.args = [compile_arg(arg, kind) for arg, kind in zip(instruct.args, kinds)]
+
+
+def compile_slots(instruction_list):
+    """
+    Function assigning every variable name an index of its slot in memory frames. TF and LF share one table
+    of names, because TF becomes LF after PUSHFRAME
+    Input: list of Instructions
+    Return: touple of number of global and local slots
+    """
+    global_slots = dict()
+    local_slots = dict()
+    for instruct in instruction_list:
+        for arg in instruct.get_args():
+            if arg.type == 'var':
+                slots = global_slots if arg.frame == 'GF' else local_slots
+                arg.slot = slots.setdefault(arg.name, len(slots))
+    return len(global_slots), len(local_slots)
+
+
+def link_labels(instruction_list):
+    """
+    Function collecting all LABELs and resolving label operands of CALL and jumps to index of their LABEL.
+    Undefined label is an error of the program even in code that is never executed
+    Input: list of Instructions
+    """
+    labels = dict()
+    for index, instruct in enumerate(instruction_list):
+        if instruct.opcode == 'LABEL':
+            name = instruct.get_args()[0].value
+            if name in labels: error_exit(52, "Error 52: label redefinition")
+            labels[name] = index
+
+    for instruct in instruction_list:
+        if instruct.opcode != 'LABEL' and OPERANDS.get(instruct.opcode, ())[:1] == ('label',):
+            label = instruct.get_args()[0]
+            if label.value not in labels: error_exit(52, "Error 52: Undefined label")
+            label.target = labels[label.value]
+
+
+def load_program(source, source_format='xml'):
+    """
+    Function loading source and running all passes over its instructions
+    Input: binary file with source, its format from SOURCE_FORMATS
+    Return: touple of list of Instructions, number of global and local slots
+    """
+    instruction_list = SOURCE_FORMATS[source_format](source)
+    compile_args(instruction_list)  # Resolve arguments before execution
+    global_slots, local_slots = compile_slots(instruction_list)
+    link_labels(instruction_list)  # Resolve jump targets
+    return instruction_list, global_slots, local_slots
+
+
+def cache_path(cache_dir, source, source_format='xml'):
+    """
+    Function computing file of compiled program in cache from content and format of source and of this interpreter
+    Input: cache directory, source as bytes, its format
+    Return: path of the cache file
+    """
+    import hashlib
+    import marshal
+    digest = hashlib.sha256()
+    with open(__file__, 'rb') as interpreter:
+        digest.update(interpreter.read())
+    digest.update(b'%d:%s:%d' % (marshal.version, source_format.encode(), len(source)))
+    digest.update(source)
+    return os.path.join(cache_dir, digest.hexdigest() + '.ippc')
+
+
+def cache_store(path, program):
+    """
+    Function writing compiled program to cache. File is written under temporary name and renamed, so concurrent
+    processes never see it incomplete
+    Input: path of the cache file, touple returned by load_program()
+    """
+    import marshal
+    import tempfile
+    instruction_list, global_slots, local_slots = program
+    instructions = list()
+    for instruct in instruction_list:
+        args = list()
+        for arg in instruct.get_args():
+            if arg.type == 'var':
+                args.append((arg.type, arg.value, arg.slot))
+            elif arg.type == 'label':
+                args.append((arg.type, arg.value, arg.target))
+            else:
+                args.append((arg.type, arg.value))
+        instructions.append((instruct.order, instruct.opcode, tuple(args)))
+    data = CACHE_MAGIC + marshal.dumps((global_slots, local_slots, tuple(instructions)))
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, temp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(handle, 'wb') as file:
+            file.write(data)
+        os.replace(temp, path)
+    except OSError:
+        pass  # Program still runs without cache
+
+
+def cache_load(path):
+    """
+    Function reading compiled program from cache through mmap
+    Input: path of the cache file
+    Return: touple like load_program() or None if the file is missing or damaged
+    """
+    import marshal
+    try:
+        with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(CACHE_MAGIC)] != CACHE_MAGIC:
+                return None
+            with memoryview(data) as view:
+                global_slots, local_slots, instructions = marshal.loads(view[len(CACHE_MAGIC):])
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+
+    instruction_list = list()
+    for order, opcode, args in instructions:
+        instruct = Instruction(order, opcode)
+        for arg in args:
+            if arg[0] == 'var':
+                operand = Reference(arg[1])
+                operand.slot = arg[2]
+            elif arg[0] == 'label':
+                operand = Label(arg[1])
+                operand.target = arg[2]
+            else:
+                operand = Variable(arg[0], arg[1])
+            instruct.args.append(operand)
+        instruction_list.append(instruct)
+    return instruction_list, global_slots, local_slots
+
+
+def basic_blocks(instruction_list):
+    """
+    Function splitting instructions into basic blocks of control flow graph. A block starts at the first
+    instruction, at every LABEL and after every instruction that jumps, calls, returns or exits
+    Input: list of Instructions
+    Return: list of touples of index of the first instruction, index after the last one and list of indexes
+    of successor blocks
+    """
+    leaders = {0}
+    for index, instruct in enumerate(instruction_list):
+        if instruct.opcode == 'LABEL':
+            leaders.add(index)
+        elif instruct.opcode in BRANCHES or instruct.opcode in ('RETURN', 'EXIT'):
+            leaders.add(index + 1)
+    starts = sorted(leader for leader in leaders if leader < len(instruction_list))
+    block_of = {start: block for block, start in enumerate(starts)}
+
+    blocks = list()
+    for block, start in enumerate(starts):
+        end = starts[block + 1] if block + 1 < len(starts) else len(instruction_list)
+        last = instruction_list[end - 1]
+        successors = list()
+        if last.opcode in BRANCHES:
+            successors.append(block_of[last.get_args()[0].target])
+        # After CALL execution continues by RETURN
+        if last.opcode not in ('JUMP', 'RETURN', 'EXIT') and end in block_of:
+            successors.append(block_of[end])
+        blocks.append((start, end, successors))
+    return blocks
+
+
+def fold_value(opcode, symbs):
+    """
+    Function computing result of instruction on constants the same way as its handler
+    Input: OPCODE, list of constant operands
+    Return: Variable with result or None if the instruction would end with an error
+    """
+    if opcode in ('ADD', 'SUB', 'MUL', 'IDIV', 'DIV'):
+        var1, var2 = symbs
+        if var1.type != var2.type or var1.type not in ('int', 'float'):
+            return None
+        if opcode in ('IDIV', 'DIV') and var2.value == 0:
+            return None
+        if opcode == 'DIV' and var1.type == 'int':
+            return None
+        match opcode:
+            case 'ADD':
+                result = var1.value + var2.value
+            case 'SUB':
+                result = var1.value - var2.value
+            case 'MUL':
+                result = var1.value * var2.value
+            case 'IDIV':
+                result = var1.value // var2.value
+            case 'DIV':
+                result = var1.value / var2.value
+        return Variable(var1.type, result)
+
+    if opcode in ('LT', 'GT', 'EQ', 'AND', 'OR'):
+        var1, var2 = symbs
+        if opcode != 'EQ' and (var1.type == 'nil' or var2.type == 'nil'):
+            return None
+        if var1.type != var2.type and (opcode != 'EQ' or (var1.type != 'nil' and var2.type != 'nil')):
+            return None
+        if opcode in ('AND', 'OR') and var1.type != 'bool':
+            return None
+        match opcode:
+            case 'LT':
+                result = var1.value < var2.value
+            case 'GT':
+                result = var1.value > var2.value
+            case 'EQ':
+                result = var1.value == var2.value
+            case 'AND':
+                result = var1.value and var2.value
+            case 'OR':
+                result = var1.value or var2.value
+        return Variable('bool', result)
+
+    var1 = symbs[0]
+    match opcode:
+        case 'NOT' if var1.type == 'bool':
+            return Variable('bool', not var1.value)
+        case 'INT2CHAR' if var1.type == 'int' and var1.value in range(0, 1114112):
+            return Variable('string', chr(var1.value))
+        case 'STRLEN' if var1.type == 'string':
+            return Variable('int', len(var1.value))
+        case 'CONCAT' if var1.type == 'string' and symbs[1].type == 'string':
+            return Variable('string', var1.value + symbs[1].value)
+    return None
+
+
+def fold_constants(instruction_list):
+    """
+    Function replacing instructions with only constant operands by MOVE of their result and jumps with constant
+    conditions by JUMP or nothing. Instructions that would end with an error stay, so errors happen the same way.
+    Labels are linked again
+    Input: list of Instructions
+    Return: new list of Instructions
+    """
+    result = list()
+    for instruct in instruction_list:
+        args = instruct.get_args()
+        if instruct.opcode in FOLDABLE and all(arg.type != 'var' for arg in args[1:]):
+            value = fold_value(instruct.opcode, args[1:])
+            if value is not None:
+                move = Instruction(instruct.order, 'MOVE')
+                move.args = [args[0], value]
+                result.append(move)
+                continue
+        if instruct.opcode in ('JUMPIFEQ', 'JUMPIFNEQ') and args[1].type != 'var' and args[2].type != 'var':
+            if args[1].type == args[2].type or 'nil' in (args[1].type, args[2].type):
+                if (args[1].value == args[2].value) == (instruct.opcode == 'JUMPIFEQ'):
+                    jump = Instruction(instruct.order, 'JUMP')
+                    jump.args = [args[0]]
+                    result.append(jump)
+                continue
+        result.append(instruct)
+    link_labels(result)
+    return result
+
+
+def remove_unreachable(instruction_list):
+    """
+    Function removing blocks that are never reached from the start of the program, jumps to the next instruction
+    and LABELs that are not targets of any jump or CALL. Labels are linked again
+    Input: list of Instructions with linked labels
+    Return: new list of Instructions
+    """
+    blocks = basic_blocks(instruction_list)
+    reached = set()
+    pending = [0] if blocks else []
+    while pending:
+        block = pending.pop()
+        if block not in reached:
+            reached.add(block)
+            pending.extend(blocks[block][2])
+
+    result = list()
+    for block, (start, end, _) in enumerate(blocks):
+        if block in reached:
+            result.extend(instruction_list[start:end])
+    # JUMP to the LABEL right after it does nothing
+    result = [instruct for index, instruct in enumerate(result)
+              if instruct.opcode != 'JUMP' or index + 1 == len(result) or result[index + 1].opcode != 'LABEL'
+              or result[index + 1].get_args()[0].value != instruct.get_args()[0].value]
+    targets = {instruct.get_args()[0].value for instruct in result if instruct.opcode in BRANCHES}
+    result = [instruct for instruct in result if instruct.opcode != 'LABEL' or instruct.get_args()[0].value in targets]
+    link_labels(result)
+    return result
+
+
+def operand_type(symb, state):
+    """
+    Function returning type of operand known by infer_types()
+    Input: operand, dictionary of slots of GF vars to their known types
+    Return: type or None if it is not known
+    """
+    if symb.type != 'var':
+        return symb.type
+    if symb.frame == 'GF':
+        return state.get(symb.slot)
+    return None
+
+
+def proven(opcode, type1, type2=None) -> bool:
+    """
+    Function checking if instruction with operands of given types passes all checks of operand types
+    Input: OPCODE, known types of operands or None
+    Return: bool
+    """
+    match opcode:
+        case 'ADD' | 'SUB' | 'MUL' | 'IDIV' | 'DIV':
+            return type1 == type2 and type1 in ('int', 'float')
+        case 'LT' | 'GT':
+            return type1 == type2 and type1 in ('int', 'float', 'string', 'bool')
+        case 'EQ' | 'JUMPIFEQ' | 'JUMPIFNEQ':
+            return type1 is not None and type2 is not None and (type1 == type2 or 'nil' in (type1, type2))
+        case 'AND' | 'OR':
+            return type1 == type2 == 'bool'
+        case 'NOT':
+            return type1 == 'bool'
+        case 'CONCAT':
+            return type1 == type2 == 'string'
+        case 'STRLEN':
+            return type1 == 'string'
+    return False
+
+
+def transfer_types(instruct, state):
+    """
+    Function updating known types of GF vars by one instruction. A var gets known type only from an instruction
+    that ends with an error for any other type, so a var with known type is always defined and initialized
+    Input: Instruction, dictionary of slots of GF vars to their known types
+    """
+    if OPERANDS.get(instruct.opcode, ())[:1] != ('var',):
+        return
+    dest, *symbs = instruct.get_args()
+    if dest.frame != 'GF':
+        return
+    if instruct.opcode == 'MOVE':
+        result = operand_type(symbs[0], state)
+    elif instruct.opcode in ('ADD', 'SUB', 'MUL', 'IDIV', 'DIV'):
+        # Both operands must have the same type
+        result = operand_type(symbs[0], state) or operand_type(symbs[1], state)
+    else:
+        result = RESULT_TYPES.get(instruct.opcode)
+    if result is None:
+        state.pop(dest.slot, None)
+    else:
+        state[dest.slot] = result
+
+
+def infer_types(instruction_list):
+    """
+    Function inferring types of GF vars by dataflow analysis over basic blocks and marking instructions from TYPED
+    whose operand types are proven, they get handlers without checks of operand types. Vars in TF and LF and values
+    from READ and POPS are not known. Nothing is known after CALL returns, because the called code can change any var
+    Input: list of Instructions with linked labels
+    """
+    blocks = basic_blocks(instruction_list)
+    states = [None] * len(blocks)  # Known types at the start of every reached block
+    pending = list()
+    if blocks:
+        states[0] = dict()
+        pending.append(0)
+    while pending:
+        block = pending.pop()
+        start, end, successors = blocks[block]
+        state = dict(states[block])
+        for index in range(start, end):
+            transfer_types(instruction_list[index], state)
+        for successor in successors:
+            incoming = state
+            if instruction_list[end - 1].opcode == 'CALL' and blocks[successor][0] == end:
+                incoming = dict()
+            if states[successor] is None:
+                merged = dict(incoming)
+            else:
+                merged = {slot: known for slot, known in states[successor].items() if incoming.get(slot) == known}
+            if merged != states[successor]:
+                states[successor] = merged
+                pending.append(successor)
+
+    for block, (start, end, _) in enumerate(blocks):
+        state = dict(states[block] or ())
+        for index in range(start, end):
+            instruct = instruction_list[index]
+            symbs = instruct.get_args()[1:]
+            instruct.typed = states[block] is not None and instruct.opcode in TYPED and \
+                proven(instruct.opcode, *[operand_type(symb, state) for symb in symbs])
+            transfer_types(instruct, state)
+
+
+def optimize_program(instruction_list, optimize):
+    """
+    Function running optimizations of the whole program
+    Input: list of Instructions, names of optimizations
+    Return: new list of Instructions
+    """
+    if 'fold' in optimize:
+        instruction_list = remove_unreachable(fold_constants(instruction_list))
+    if 'types' in optimize:
+        infer_types(instruction_list)
+    return instruction_list
+
+
+class InputReader:
+    """
+    Lines of input for READ. Input is read in large blocks (regular files through mmap), every block is decoded at
+    once and split into lines at line ends of universal newlines
+    """
+    BLOCK = 1 << 20
+
+    def __init__(self, file, encoding):
+        self.source = file
+        self.encoding = encoding
+        try:
+            status = os.fstat(file.fileno())
+            if stat.S_ISREG(status.st_mode) and status.st_size > file.tell():
+                self.source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                self.source.seek(file.tell())
+        except (OSError, ValueError):
+            pass  # Pipes, terminals and files in memory are read by blocks
+        # READ takes next line of the current block without calling Python code, empty string ends the input
+        self.readline = partial(next, chain.from_iterable(self.blocks()), '')
+
+    def close(self):
+        """
+        Closes the input file
+        """
+        self.source.close()
+
+    def split(self, data) -> list:
+        """
+        Decodes block of input ending at a line end or at the end of input and splits it into lines
+        :param data: bytes
+        :return: list of strings without line ends
+        """
+        text = data.decode(self.encoding)
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        lines = text.split('\n')
+        if lines[-1] == '':
+            lines.pop()
+        return lines
+
+    def blocks(self):
+        """
+        Generator of blocks of input
+        :return: iterator of lists of lines without line ends
+        """
+        # read1() returns data as soon as some is available, which keeps interactive stdin working
+        read = getattr(self.source, 'read1', self.source.read)
+        rest = b''  # Incomplete last line of the block
+        while True:
+            data = read(self.BLOCK)
+            if not data:
+                break
+            data = rest + data
+            # \r at the end of block can be the first half of \r\n
+            end = len(data) - 1 if data.endswith(b'\r') else len(data)
+            cut = max(data.rfind(b'\n', 0, end), data.rfind(b'\r', 0, end)) + 1
+            rest = data[cut:]
+            if cut:
+                yield self.split(data[:cut])
+        if rest:
+            yield self.split(rest)
+
+
+def open_input(path):
+    """
+    Function opening input of READ
+    Input: path of input file or None for stdin
+    Return: InputReader
+    """
+    if path is None:
+        return InputReader(sys.stdin.buffer, sys.stdin.encoding)
+    try:
+        return InputReader(open(path, 'rb'), locale.getpreferredencoding(False))
+    except FileNotFoundError:
+        error_exit(11, "Error 11: File does not exist")
+
+
+class ProgramExit(Exception):
+    """
+    End of interpretation with a return code, raised by error_exit() and by EXIT. Message is written to stderr by
+    whoever catches it, after the output of the program is flushed
+    """
+    def __init__(self, code, message=None):
+        super().__init__(code, message)
+        self.code = code
+        self.message = message
+
+
+def error_exit(err_num, err_msg):
+    """
+    Function ending interpretation with error code and a error message for stderr\n
+    Input: error number, error message
+    """
+    raise ProgramExit(err_num, err_msg)
+
+
+class Variable:
+    """
+    Typed value of a var or of a constant. Values are native: int, float, str, True/False for bool and None for nil,
+    their text is made only by WRITE, TYPE and DPRINT
+    """
+    __slots__ = ('type', 'value')
+
+    def __init__(self, arg_type, value):
+        self.type = arg_type
+        self.value = value
+
+    def check_var_empty(self) -> bool:
+        """
+        Function that checks if Variable is initialized or not
+        :return: bool
+        """
+        return self.type is None
+
+    def text(self) -> str:
+        """
+        Returns value as text written by WRITE
+        :return: string
+        """
+        match self.type:
+            case 'string':
+                return self.value
+            case 'bool':
+                return 'true' if self.value else 'false'
+            case 'float':
+                return self.value.hex()
+            case 'nil':
+                return ''
+        return str(self.value)
+
+    def length(self) -> int:
+        """
+        Returns length of string value
+        :return: int
+        """
+        return len(self.value)
+
+    def char(self, index) -> str:
+        """
+        Returns one character of string value
+        :param index: int
+        :return: string
+        """
+        return self.value[index]
+
+    def source(self) -> str:
+        """
+        Function returning operand as text of IPPcode23
+        :return: string
+        """
+        match self.type:
+            case 'string':
+                return 'string@' + ''.join(char if char > ' ' and char not in '#\\' else '\\%03d' % ord(char)
+                                           for char in self.value)
+            case 'float':
+                return 'float@' + self.value.hex()
+            case 'var' | 'label' | 'type':
+                return self.value
+            case 'nil':
+                return 'nil@nil'
+        return self.type + '@' + self.text()
+
+
+class Reference(Variable):
+    """Variable operand with its memory frame and name already split"""
+    __slots__ = ('frame', 'name', 'slot')
+
+    def __init__(self, value):
+        super().__init__('var', value)
+        self.frame, self.name = value.split('@', 1)
+        self.slot = None
+
+
+class Label(Variable):
+    """Label operand, target is the index of its LABEL instruction set by link_labels()"""
+    __slots__ = ('target',)
+
+    def __init__(self, value):
+        super().__init__('label', value)
+        self.target = None
+
+
+class StringBuffer(Variable):
+    """
+    String value of a var changed in place by CONCAT and SETCHAR. Appended strings are kept as parts, SETCHAR and
+    GETCHAR turn parts into a list of characters and the text is joined only when the whole value is read
+    """
+    __slots__ = ('parts', 'chars', 'joined', 'size')
+
+    def __init__(self, text):
+        self.type = 'string'
+        self.parts = [text]
+        self.chars = False  # True when parts are single characters
+        self.joined = text
+        self.size = len(text)
+
+    @property
+    def value(self) -> str:
+        if self.joined is None:
+            self.joined = ''.join(self.parts)
+            if not self.chars:
+                self.parts = [self.joined]
+        return self.joined
+
+    def length(self) -> int:
+        return self.size
+
+    def to_chars(self):
+        """
+        Splits the value into single characters
+        """
+        if not self.chars:
+            self.parts = list(self.value)
+            self.chars = True
+
+    def char(self, index) -> str:
+        self.to_chars()
+        return self.parts[index]
+
+    def append(self, text):
+        """
+        Appends string to the value
+        :param text: string
+        """
+        if self.chars:
+            self.parts.extend(text)
+        else:
+            self.parts.append(text)
+        self.size += len(text)
+        self.joined = None
+
+    def setchar(self, index, char):
+        """
+        Replaces one character of the value
+        :param index: int
+        :param char: string with one character
+        """
+        self.to_chars()
+        self.parts[index] = char
+        self.joined = None
+
+
+def string_buffer(memory, var, value) -> StringBuffer:
+    """
+    Function returning buffer in the slot of a var, string value in the slot is replaced by a buffer first. Every
+    slot holds its own Variable (MOVE, POPS and all results create new ones), so it can be changed in place
+    Input: Memory, Reference, its current value
+    Return: StringBuffer
+    """
+    if isinstance(value, StringBuffer):
+        return value
+    buffer = StringBuffer(value.value)
+    memory.get_frame(var)[var.slot] = buffer
+    return buffer
+
+
+# Content of a slot of a var that was not defined by DEFVAR
+UNDEFINED = object()
+# Content of a slot of a var that was defined but not initialized
+UNINITIALIZED = Variable(None, None)
+# Constants nil, true and false shared by all operands
+NIL = Variable('nil', None)
+TRUE = Variable('bool', True)
+FALSE = Variable('bool', False)
+
+
+class Memory:
+    """
+    State of one run of a program: memory frames, program counter, data and call stack and input and output streams
+    """
+    def __init__(self, global_slots, local_slots, input_handle, output, errors):
+        self.frames = {
+            'GF': [UNDEFINED] * global_slots,
+            'LF': None,
+            'TF': None
+        }
+        # All local frames, the top one is also in frames['LF'], so PUSHFRAME and POPFRAME only move references
+        self.frame_stack = []
+        self.local_slots = local_slots
+        self.program_counter = 0
+        # Data stack holds resolved values as parallel lists of types and values
+        self.stack_types = []
+        self.stack_values = []
+        self.call_stack = []
+        self.input_handle = input_handle
+        self.output = output
+        self.errors = errors
+
+    def get_frame(self, var) -> list:
+        """
+        Returns slots of the memory frame of given var, checks that the frame exists
+        :param var: Reference
+        :return: list of slots
+        """
+        frame = self.frames.get(var.frame, UNDEFINED)
+        if frame is None:
+            error_exit(55, "Error 55: Memory frame %s doesn't exist" % var.frame)
+        if frame is UNDEFINED:
+            error_exit(55, "Error 55: Non-existent frame")
+        return frame
+
+    def check_var_exists(self, var) -> bool:
+        """
+        Checks if given var exists
+        :param var: Reference
+        :return: bool
+        """
+        return self.get_frame(var)[var.slot] is not UNDEFINED
+
+    def set_var(self, var, symb_type, symb_value):
+        """
+        Takes destination variable and sets new values given in symb_type and symb_value
+        :param var: target Reference
+        :param symb_type: type of value
+        :param symb_value: value of type string/int/float/bool/nil
+        """
+        self.get_frame(var)[var.slot] = Variable(symb_type, symb_value)
+
+    def symb_value(self, symb) -> Variable:
+        """
+        Gets Variable and returns Variable with its contents from Memory Frames
+        :param symb: input Variable
+        :return: returning Variable
+        """
+        if symb.type == 'var':
+            value = self.get_frame(symb)[symb.slot]
+            if value is UNDEFINED: error_exit(54, "Error 54: Non-existent var")
+            return value
+        # Constants are already resolved by compile_args()
+        return symb
+
+    def peek_value(self, symb):
+        """
+        Gets Variable like symb_value, but returns None instead of ending with an error
+        :param symb: input Variable
+        :return: Variable or None
+        """
+        if symb.type != 'var':
+            return symb
+        frame = self.frames.get(symb.frame)
+        if frame is None or frame[symb.slot] is UNDEFINED:
+            return None
+        return frame[symb.slot]
+
+
+class Instruction:
+    __slots__ = ('order', 'opcode', 'args', 'typed')
+
+    def __init__(self, order, opcode):
+        self.order = order
+        self.opcode = opcode
+        self.args = []
+        self.typed = False  # Operand types proven by infer_types()
+
+    def add_argument(self, arg_type, value):
+        """
+        Adds argument to the instruction
+        :param arg_type: string with type
+        :param value: value of a var
+        """
+        self.args.append(Variable(arg_type, value))
+
+    def get_args(self):
+        """
+        Returns list of arguments of an instruction
+        :return: args[]
+        """
+        return self.args
+
+
+    def source(self) -> str:
+        """
+        Returns instruction as a line of IPPcode23
+        :return: string
+        """
+        return ' '.join([self.opcode] + [arg.source() for arg in self.args])
+
+    def check_arg_num(self, num):
+        """
+        Checks if correct number of arguments was given to an instruction
+        :param num: int
+        """
+        if num != len(self.args):
+            error_exit(32, "Error 32: Wrong number of arguments")
+
+    def move(self, memory):
+        """
+        Moves values <symb1> to <var>
+        """
+        dest = self.get_args()[0]
+        if not memory.check_var_exists(dest): error_exit(54, "Error 54: Non-existent variable")
+
+        symb = memory.symb_value(self.get_args()[1])
+        memory.set_var(dest, symb.type, symb.value)
+
+    def write(self, memory):
+        """
+        Prints out the value of a var
+        """
+        symb1 = memory.symb_value(self.get_args()[0])
+        memory.output.write(symb1.text())
+
+    def defvar(self, memory):
+        """
+        Defines empty Variable in given Memory Frame
+        """
+        dest = self.get_args()[0]
+        frame = memory.get_frame(dest)
+        if frame[dest.slot] is not UNDEFINED:
+            error_exit(52, "Error 52: Variable re-definition")
+
+        # Init of an empty <var>
+        frame[dest.slot] = UNINITIALIZED
+
+    def createframe(self, memory):
+        """
+        Creates empty TemporaryFrame
+        """
+        memory.frames['TF'] = [UNDEFINED] * memory.local_slots
+
+    def pushframe(self, memory):
+        """
+        Pushes TemporaryFrame into LocalFrame and clears TF
+        """
+        if memory.frames['TF'] is None:
+            error_exit(55, "Error 55: No frame to push")
+        memory.frame_stack.append(memory.frames['TF'])
+        memory.frames['LF'] = memory.frames['TF']
+        memory.frames['TF'] = None
+
+    def popframe(self, memory):
+        """
+        Pops a frame from LocalFrame to TemporaryFrame
+        """
+        if memory.frames['LF'] is None:
+            error_exit(55, "Error 55: No frame to pop")
+        memory.frames['TF'] = memory.frame_stack.pop()
+        memory.frames['LF'] = memory.frame_stack[-1] if memory.frame_stack else None
+
+    def call(self, memory):
+        """Calls LABEL"""
+        memory.call_stack.append(memory.program_counter)
+        memory.program_counter = self.get_args()[0].target
+
+    def return_ins(self, memory):
+        if not memory.call_stack: error_exit(56, "Error 56: Missing value on instruction stack")
+        memory.program_counter = memory.call_stack.pop()
+
+    def pushs(self, memory):
+        """
+        Pushses value of symb into data stack
+        """
+        var1 = memory.symb_value(self.get_args()[0])
+        memory.stack_types.append(var1.type)
+        memory.stack_values.append(var1.value)
+
+    def pops(self, memory):
+        """Pops value from data stack to a var"""
+        if not memory.stack_types: error_exit(56, "Error 56: Pops from empty stack")
+        dest = self.get_args()[0]
+        if not memory.check_var_exists(dest): error_exit(54, "Error 54: Non-existent variable")
+        memory.set_var(dest, memory.stack_types.pop(), memory.stack_values.pop())
+
+    def add_sub_mul_idiv(self, memory, stack_flag):
+        """
+        Instructions add sub mul idiv div and their stack versions
+        :param stack_flag: 0 for stack operation, 1 for normal type
+        """
+        # Normal option
+        if stack_flag == 1:
+            dest = self.get_args()[0]
+            if not memory.check_var_exists(dest):
+                error_exit(54, "Error 54: Non-existent variable")
+            var1 = memory.symb_value(self.get_args()[1])
+            var2 = memory.symb_value(self.get_args()[2])
+            type1, value1, type2, value2 = var1.type, var1.value, var2.type, var2.value
+        # Stack option
+        else:
+            if len(memory.stack_types) < 2: error_exit(56, "Error 56: Popping from empty stack")
+            type2, value2 = memory.stack_types.pop(), memory.stack_values.pop()
+            type1, value1 = memory.stack_types.pop(), memory.stack_values.pop()
+        if type1 not in ('int', 'float') or type2 not in ('int', 'float'):
+            error_exit(53, "Error 53: wrong operand type")
+        if type1 != type2: error_exit(53, "Error 53: Wrong operands")
+
+        match self.opcode:
+            case 'ADD' | 'ADDS':
+                result = value1 + value2
+            case 'SUB' | 'SUBS':
+                result = value1 - value2
+            case 'MUL' | 'MULS':
+                result = value1 * value2
+            case 'IDIV' | 'IDIVS':
+                if value2 == 0: error_exit(57, "Error 57: Zero division")
+                result = value1 // value2
+            case 'DIV':
+                if value2 == 0: error_exit(57, "Error 57: Zero division")
+                result = value1 / value2
+        # Normal option saves to var
+        if stack_flag == 1:
+            memory.set_var(dest, type1, result)
+        # Stack option pushes result to data stack
+        else:
+            memory.stack_types.append(type1)
+            memory.stack_values.append(result)
+
+    def lt_gt_eq_and_or(self, memory, stack_flag):
+        """LT/GT/EQ/AND/OR instructions and their stack versions"""
+        # Normal version
+        if stack_flag == 1:
+            dest = self.get_args()[0]
+            if not memory.check_var_exists(dest):
+                error_exit(54, "Error 54: Non-existent variable")
+            symb1 = memory.symb_value(self.get_args()[1])
+            symb2 = memory.symb_value(self.get_args()[2])
+            type1, value1, type2, value2 = symb1.type, symb1.value, symb2.type, symb2.value
+
+        # Stack version
+        else:
+            if len(memory.stack_types) < 2:
+                error_exit(56, str(memory.program_counter) + "Error 56: LTSGTSEQSANDS Pop from empty stack")
+            type2, value2 = memory.stack_types.pop(), memory.stack_values.pop()
+            type1, value1 = memory.stack_types.pop(), memory.stack_values.pop()
+        if self.opcode not in ('EQ', 'EQS') and (type1 == 'nil' or type2 == 'nil'):
+            error_exit(53, "Error 53: nil operand")
+        if self.opcode not in ('EQ', 'EQS'):
+            if type1 != type2:
+                error_exit(53, "Error 53: Wrong operands")
+        if self.opcode in ('EQ', 'EQS'):
+            if type1 != 'nil' and type2 != 'nil':
+                if type1 != type2:
+                    error_exit(53, "Error 53: Wrong operands")
+
+        match self.opcode:
+            case 'LT' | 'LTS':
+                result = value1 < value2
+            case 'GT' | 'GTS':
+                result = value1 > value2
+            case 'EQ' | 'EQS':
+                result = value1 == value2
+            case 'AND' | 'ANDS':
+                # Check types
+                if type1 != 'bool' or type2 != 'bool': error_exit(53, "Error 53: Wrong operand type")
+                result = value1 and value2
+            case 'OR' | 'ORS':
+                # Check types
+                if type1 != 'bool' or type2 != 'bool': error_exit(53, "Error 53: Wrong operand type")
+                result = value1 or value2
+
+        # Normal version returns value to a var
+        if stack_flag == 1:
+            memory.set_var(dest, 'bool', result)
+
+        # Stack version appends result to a stack
+        else:
+            memory.stack_types.append('bool')
+            memory.stack_values.append(result)
+
+    def not_ins(self, memory, stack_flag):
+        """Instruction negates the value of a var"""
+        # Normal version
+        if stack_flag == 1:
+            dest = self.get_args()[0]
+            if not memory.check_var_exists(dest):
+                error_exit(54, "Error 54: Non-existent variable")
+            symb1 = memory.symb_value(self.get_args()[1])
+            if symb1.type != 'bool': error_exit(53, "Error 53: Wrong operand type")
+            value1 = symb1.value
+
+        # Stack version
+        else:
+            if not memory.stack_types: error_exit(56, "Error 56: Popping from empty stack")
+            type1, value1 = memory.stack_types.pop(), memory.stack_values.pop()
+            if type1 != 'bool': error_exit(53, "Error 53: Wrong operand type")
+
+        result = not value1
+
+        # Normal version returns result to a var
+        if stack_flag == 1:
+            memory.set_var(dest, 'bool', result)
+
+        # Stack version pushes result to data stack
+        else:
+            memory.stack_types.append('bool')
+            memory.stack_values.append(result)
+
+    def int2char(self, memory, stack_flag):
+        # Normal version
+        if stack_flag == 1:
+            dest = self.get_args()[0]
+            if not memory.check_var_exists(dest):
+                error_exit(54, "Error 54: Non-existent variable")
+            symb = self.get_args()[1]
+            var1 = memory.symb_value(symb)
+            type1, value1 = var1.type, var1.value
+
+        # Stack version
+        else:
+            if not memory.stack_types: error_exit(56, "Error 56: Pop from empty stack")
+            type1, value1 = memory.stack_types.pop(), memory.stack_values.pop()
+
+        if type1 is None:
+            error_exit(56, "Error 56: Uninitialized var")
+        if type1 != 'int': error_exit(53, "Error 53: Wrong operand type")
+        if value1 not in range(0, 1114112): error_exit(58, "Error 58: Wrong string operation")
+        value = chr(value1)
+        # Normal version returns value to a var
+        if stack_flag == 1:
+            memory.set_var(dest, 'string', value)
+        # Stack version pushes result to a data stack
+        else:
+            memory.stack_types.append('string')
+            memory.stack_values.append(value)
+
+    def int2float(self, memory):
+        """BONUS IMPLEMENTATION: Converts int to float"""
+        dest = self.get_args()[0]
+        if not memory.check_var_exists(dest):
+            error_exit(54, "Error 54: Non-existent variable")
+        symb = self.get_args()[1]
+        var1 = memory.symb_value(symb)
+        if var1.check_var_empty():
+            error_exit(56, "Error 56: Uninitialized var")
+        if var1.type != 'int': error_exit(53, "Error 53: Wrong operand type")
+        memory.set_var(dest, 'float', float(var1.value))
+
+    def float2int(self, memory):
+        """BONUS IMPLEMENTATION: Converts float to int"""
+        dest = self.get_args()[0]
+        if not memory.check_var_exists(dest):
+            error_exit(54, "Error 54: Non-existent variable")
+        symb = self.get_args()[1]
+        var1 = memory.symb_value(symb)
+        if var1.check_var_empty():
+            error_exit(56, "Error 56: Uninicialized var")
+        if var1.type != 'float': error_exit(53, "Error 53: Wrong operand type")
+        memory.set_var(dest, 'int', int(var1.value))
+
+    def stri2int(self, memory, stack_flag):
+        # Normal version
+        if stack_flag == 1:
+            dest = self.get_args()[0]
+            if not memory.check_var_exists(dest):
+                error_exit(54, "Error 54: Non-existent variable")
+            symb1 = self.get_args()[1]
+            symb2 = self.get_args()[2]
+            var1 = memory.symb_value(symb1)  # string@abce
+            var2 = memory.symb_value(symb2)  # int@3
+
+        # Stack version
+        else:
+            if len(memory.stack_types) < 2: error_exit(56, "Error 56: Popping from empty stack")
+            var2 = Variable(memory.stack_types.pop(), memory.stack_values.pop())
+            var1 = Variable(memory.stack_types.pop(), memory.stack_values.pop())
+
+        if var1.type != 'string' or var2.type != 'int':
+            error_exit(53, "Error 53: Wrong operand type")
+        if var2.value not in range(0, var1.length()): error_exit(58, "Error 58: Wrong string action")
+        result = ord(var1.char(var2.value))
+        # Normal version
+        if stack_flag == 1:
+            memory.set_var(dest, 'int', result)
+
+        # Stack version
+        else:
+            memory.stack_types.append('int')
+            memory.stack_values.append(result)
+
+    def read(self, memory):
+        # Parse target var
+        dest = self.get_args()[0]
+        if not memory.check_var_exists(dest):
+            error_exit(54, "Error 54: Non-existent variable")
+        arg_type = self.get_args()[1].value
+        if arg_type not in ('int', 'string', 'bool', 'float'): error_exit(53, "Error 53: Wrong operand type")
+
+        # Read from input
+        inpt = memory.input_handle.readline().strip()
+        try:
+            # Convert input to correct type and store into var
+            match arg_type:
+                case 'int':
+                    result = int(inpt)
+                case 'float':
+                    result = float.fromhex(inpt)
+                case 'string':
+                    result = inpt
+                case 'bool':
+                    result = inpt.lower() == 'true'
+        except ValueError:
+            arg_type = 'nil'
+            result = None
+        memory.set_var(dest, arg_type, result)
+
+    def concat(self, memory):
+        """Concatenate two strings and store result in var"""
+        dest = self.get_args()[0]
+        if not memory.check_var_exists(dest):
+            error_exit(54, "Error 54: Non-existent variable")
+        symb1 = self.get_args()[1]
+        symb2 = self.get_args()[2]
+        var1 = memory.symb_value(symb1)  # string@abce
+        var2 = memory.symb_value(symb2)  # string@xyz
+        if var1.type != 'string' or var2.type != 'string':
+            error_exit(53, "Error 53: Wrong operand type")
+        # Appending to the same var extends its buffer instead of copying it
+        if memory.get_frame(dest)[dest.slot] is var1:
+            string_buffer(memory, dest, var1).append(var2.value)
+            return
+        result = var1.value + var2.value
+        memory.set_var(dest, 'string', result)
+
+    def strlen(self, memory):
+        """Get length of symb1 and store in var"""
+        dest = self.get_args()[0]
+        if not memory.check_var_exists(dest):
+            error_exit(54, "Error 54: Non-existent variable")
+
+        symb1 = self.get_args()[1]
+        var1 = memory.symb_value(symb1)
+        if var1.type != 'string': error_exit(53, "Error 53: Wrong operand type")
+        result = var1.length()
+        memory.set_var(dest, 'int', result)
+
+    def getchar(self, memory):
+        """
+        Gets char from if string<symb1> on int<symb2> index and stores it in var<var1>
+        """
+        dest = self.get_args()[0]
+        if not memory.check_var_exists(dest):
+            error_exit(54, "Error 54: Non-existent variable")
+        symb1 = self.get_args()[1]
+        symb2 = self.get_args()[2]
+
+        var1 = memory.symb_value(symb1)  # string@some
+        var2 = memory.symb_value(symb2)  # int@5
+
+        if var1.type != 'string' or var2.type != 'int': error_exit(53, "Error 53: Wrong operand type")
+        if var2.value not in range(var1.length()): error_exit(58, "Error 58: Wrong string indexing")
+
+        result = var1.char(var2.value)
+        memory.set_var(dest, 'string', result)
+
+    def setchar(self, memory):
+        """Change string<var>'s int<symb1>-th char to char<symb2> """
+        dest = self.get_args()[0]
+        target = memory.symb_value(dest)
+
+        symb1 = self.get_args()[1]
+        symb2 = self.get_args()[2]
+        var1 = memory.symb_value(symb1)  # int@5
+        var2 = memory.symb_value(symb2)  # string@hello
+        if var1.type != 'int' or var2.type != 'string': error_exit(53, "Error 53: Wrong operand type")
+        if target.type != 'string': error_exit(53, "Error 53: Wrong operand type")
+        if var1.value not in range(target.length()): error_exit(58, "Error 58: Wrong string indexing")
+        if var2.value == '': error_exit(58, "Error 58: Invalid string operation")
+        # Character is replaced in the buffer of the var
+        string_buffer(memory, dest, target).setchar(var1.value, var2.value[0])
+
+    def type_inst(self, memory):
+        """Automatically detect type of symb and return it to var"""
+        dest = self.get_args()[0]
+        if not memory.check_var_exists(dest):
+            error_exit(54, "Error 54: Non-existent variable")
+
+        symb = self.get_args()[1]
+        var1 = memory.symb_value(symb)
+        if var1.check_var_empty():
+            result = ''
+        else:
+            result = var1.type
+        memory.set_var(dest, 'string', result)
+
+    def label(self, memory):
+        pass
+
+    def jump(self, memory):
+        """Unconditional jump to label"""
+        memory.program_counter = self.get_args()[0].target
+
+    def jumpif(self, memory, stack_flag):
+        """Variations of jump-if-equal and their stack versions"""
+        # Normal version
+        if stack_flag == 1:
+            var1 = memory.symb_value(self.get_args()[1])
+            var2 = memory.symb_value(self.get_args()[2])
+            type1, value1, type2, value2 = var1.type, var1.value, var2.type, var2.value
+
+        # Stack version
+        else:
+            if len(memory.stack_types) < 2: error_exit(56, "Error 56: Empty data stack")
+            type2, value2 = memory.stack_types.pop(), memory.stack_values.pop()
+            type1, value1 = memory.stack_types.pop(), memory.stack_values.pop()
+
+        if type1 != type2:
+            if type1 != 'nil' and type2 != 'nil':
+                error_exit(53, "Error 53: Wrong operand types")
+
+        if value1 == value2:
+            if self.opcode == 'JUMPIFEQ' or self.opcode == 'JUMPIFEQS':
+                memory.program_counter = self.get_args()[0].target
+        else:
+            if self.opcode == 'JUMPIFNEQ' or self.opcode == 'JUMPIFNEQS':
+                memory.program_counter = self.get_args()[0].target
+
+    def exit_inst(self, memory):
+        """Stops program execution with given return code"""
+        symb1 = self.get_args()[0]
+        var1 = memory.symb_value(symb1)
+        if symb1.type != 'int': error_exit(53, "Error 53: Wrong operand type")
+        if var1.value not in range(0, 50): error_exit(57, "Error 57: Invalid return code")
+        raise ProgramExit(var1.value)
+
+    def dprint(self, memory):
+        """Returns given value to stderr"""
+        symb1 = self.get_args()[0]
+        var1 = memory.symb_value(self.get_args()[0])
+        memory.errors.write(var1.type + '@' + var1.text())
+
+    def break_inst(self, memory):
+        pass
+
+    def clears(self, memory):
+        """Clears data stack"""
+        memory.stack_types.clear()
+        memory.stack_values.clear()
+
+    def unknown(self, memory):
+        """Executed instruction with unknown OPCODE"""
+        error_exit(32, "Error 32: Unknown OPCODE")
+
+    def bind(self):
+        """
+        Looks up the method executing this instruction in HANDLERS, unknown OPCODE fails when it's executed
+        :return: callable with Memory as the only argument
+        """
+        if self.typed:
+            return typed_handler(self)
+        method, *extra = HANDLERS.get(self.opcode, ('unknown',))
+        if extra:
+            return partial(getattr(self, method), stack_flag=extra[0])
+        return getattr(self, method)
+
+    def instr_switch(self, memory):
+        """
+        Main instruction match case, that calls instructions and checks number of their argruments
+        """
+        match self.opcode:
+            # INSTRUCTIONS FOR FRAMES, CALLS
+            case 'MOVE':  # <var> <symb>
+                self.check_arg_num(2)
+                self.move(memory)
+            case 'CREATEFRAME':
+                self.check_arg_num(0)
+                self.createframe(memory)
+            case 'PUSHFRAME':
+                self.check_arg_num(0)
+                self.pushframe(memory)
+            case 'POPFRAME':
+                self.check_arg_num(0)
+                self.popframe(memory)
+            case 'DEFVAR':  # <var>
+                self.check_arg_num(1)
+                self.defvar(memory)
+            case 'CALL':  # <label>
+                self.check_arg_num(1)
+                self.call(memory)
+            case 'RETURN':
+                self.check_arg_num(0)
+                self.return_ins(memory)
+
+            # INSTRUCTIONS FOR DATA STACK
+            case 'PUSHS':
+                self.check_arg_num(1)
+                self.pushs(memory)
+            case 'POPS':
+                self.check_arg_num(1)
+                self.pops(memory)
+
+            # INSTRUCTION FOR ARITHMETIC, RELATIONAL, BOOLEAN AND CONVERSION
+            case 'ADD' | 'SUB' | 'MUL' | 'IDIV' | 'DIV':
+                self.check_arg_num(3)
+                self.add_sub_mul_idiv(memory, 1)
+            case 'ADDS' | 'SUBS' | 'MULS' | 'IDIVS':
+                self.check_arg_num(0)
+                self.add_sub_mul_idiv(memory, 0)
+            case 'LT' | 'GT' | 'EQ' | 'AND' | 'OR':
+                self.check_arg_num(3)
+                self.lt_gt_eq_and_or(memory, 1)
+            case 'LTS' | 'GTS' | 'EQS' | 'ANDS' | 'ORS':
+                self.check_arg_num(0)
+                self.lt_gt_eq_and_or(memory, 0)
+            case 'NOT':
+                self.check_arg_num(2)
+                self.not_ins(memory, 1)
+            case 'NOTS':
+                self.check_arg_num(0)
+                self.not_ins(memory, 0)
+            case 'INT2CHAR':  # <var> <symb>
+                self.check_arg_num(2)
+                self.int2char(memory, 1)
+            case 'INT2CHARS':
+                self.check_arg_num(0)
+                self.int2char(memory, 0)
+            case 'STRI2INT':
+                self.check_arg_num(3)
+                self.stri2int(memory, 1)
+            case 'STRI2INTS':
+                self.check_arg_num(0)
+                self.stri2int(memory, 0)
+            case 'INT2FLOAT':
+                self.check_arg_num(2)
+                self.int2float(memory)
+            case 'FLOAT2INT':
+                self.check_arg_num(2)
+                self.float2int(memory)
+            # INSTRUCTION FOR I/O
+            case 'READ':
+                self.check_arg_num(2)
+                self.read(memory)
+            case 'WRITE':  # <symb>
+                self.check_arg_num(1)
+                self.write(memory)
+
+            # INSTRUCTION FOR STRING MANIPULATION
+            case 'CONCAT':
+                self.check_arg_num(3)
+                self.concat(memory)
+            case 'STRLEN':
+                self.check_arg_num(2)
+                self.strlen(memory)
+            case 'GETCHAR':
+                self.check_arg_num(3)
+                self.getchar(memory)
+            case 'SETCHAR':
+                self.check_arg_num(3)
+                self.setchar(memory)
+
+            # INSTRUCTIONS FOR TYPE-ING
+            case 'TYPE':
+                self.check_arg_num(2)
+                self.type_inst(memory)
+
+            # INSTRUCTIONS FOR FLOW CONTROL
+            case 'LABEL':
+                self.check_arg_num(1)
+                self.label(memory)
+            case 'JUMP':
+                self.check_arg_num(1)
+                self.jump(memory)
+            case 'JUMPIFEQ' | 'JUMPIFNEQ':
+                self.check_arg_num(3)
+                self.jumpif(memory, 1)
+            case 'JUMPIFEQS' | 'JUMPIFNEQS':
+                self.check_arg_num(1)
+                self.jumpif(memory, 0)
+            case 'EXIT':
+                self.check_arg_num(1)
+                self.exit_inst(memory)
+
+            # DEBUGING INSTRUCTIONS
+            case 'DPRINT':
+                self.check_arg_num(1)
+                self.dprint(memory)
+            case 'BREAK':
+                self.check_arg_num(0)
+                self.break_inst(memory)
+            case 'CLEARS':
+                self.check_arg_num(0)
+                self.clears(memory)
+            case _:
+                error_exit(32, "Error 32: Unknown OPCODE")
+
+
+class Stats:
+    """
+    Statistics of program execution (STATI extension), collected by engine run_stats
+    """
+    # OPCODEs not counted as executed instructions
+    NOT_COUNTED = ('LABEL', 'DPRINT', 'BREAK')
+
+    def __init__(self, instruction_list):
+        self.instruction_list = instruction_list
+        self.counts = [0] * len(instruction_list)
+        self.vars = 0
+        self.max_vars = 0
+
+    @staticmethod
+    def initialized(frame) -> int:
+        """
+        Counts initialized vars in a frame
+        :param frame: list of slots or None
+        :return: int
+        """
+        if frame is None:
+            return 0
+        return sum(1 for value in frame if value is not UNDEFINED and value is not UNINITIALIZED)
+
+    def wrap(self, instruct):
+        """
+        Binds instruction to its handler, instructions changing the number of initialized vars get handler
+        that also updates the counter of vars
+        :param instruct: Instruction
+        :return: callable with Memory as the only argument
+        """
+        handler = instruct.bind()
+        if instruct.opcode in ('CREATEFRAME', 'POPFRAME'):
+            # Both instructions throw away current TF
+            def frame_handler(memory):
+                tf_vars = self.initialized(memory.frames['TF'])
+                handler(memory)
+                self.vars -= tf_vars
+            return frame_handler
+        if instruct.opcode != 'DEFVAR' and OPERANDS.get(instruct.opcode, ())[:1] == ('var',):
+            dest = instruct.get_args()[0]
+
+            def var_handler(memory):
+                value = memory.get_frame(dest)[dest.slot]
+                handler(memory)
+                if value is UNDEFINED or value is UNINITIALIZED:
+                    self.vars += 1
+                    self.max_vars = max(self.vars, self.max_vars)
+            return var_handler
+        return handler
+
+    def value(self, statistic, text) -> str:
+        """
+        Returns text of one statistic
+        :param statistic: name of statistic
+        :param text: value of --print
+        :return: string
+        """
+        counted = [(count, instruct) for count, instruct in zip(self.counts, self.instruction_list)
+                   if instruct.opcode not in self.NOT_COUNTED]
+        match statistic:
+            case 'insts':
+                return str(sum(count for count, _ in counted))
+            case 'hot':
+                executed = [(-count, instruct.order) for count, instruct in counted if count]
+                return str(min(executed)[1]) if executed else ''
+            case 'vars':
+                return str(self.max_vars)
+            case 'frequent':
+                occurrences = dict()
+                for instruct in self.instruction_list:
+                    occurrences[instruct.opcode] = occurrences.get(instruct.opcode, 0) + 1
+                most = max(occurrences.values(), default=0)
+                return ','.join(sorted(opcode for opcode, count in occurrences.items() if count == most))
+            case 'print':
+                return decode_escapes(text)
+            case 'eol':
+                return '\n'
+
+    def write(self, groups):
+        """
+        Writes statistics to their files in order given on commandline
+        :param groups: list of touples of file name and list of statistics
+        """
+        for file, statistics in groups:
+            try:
+                with open(file, 'w') as stats_file:
+                    for statistic, text in statistics:
+                        stats_file.write(self.value(statistic, text))
+            except OSError:
+                error_exit(12, "Error 12: Can't write statistics to file " + file)
+
+
+class Alarm:
+    """
+    Timer of SIGALRM calling a handler every interval while keeping the timer of the caller. Handler of the caller
+    is called when its timer comes due, the handler and the remaining time of its timer are restored by stop()
+    """
+    def __init__(self, handler, interval):
+        self.handler = handler
+        self.previous = signal.signal(signal.SIGALRM, self.tick)
+        delay, self.period = signal.setitimer(signal.ITIMER_REAL, interval, interval)
+        self.due = time.monotonic() + delay if delay else None  # When the timer of the caller fires
+
+    def tick(self, signum, frame):
+        """
+        Handler of SIGALRM calling the handler of the caller when its timer is due, then the own handler
+        :param signum: number of the signal
+        :param frame: interrupted frame
+        """
+        if self.due is not None and time.monotonic() >= self.due:
+            if not callable(self.previous) and self.previous != signal.SIG_IGN:
+                # Default action of the caller is left to the system
+                self.stop()
+                return
+            self.due = self.due + self.period if self.period else None
+            if callable(self.previous):
+                self.previous(signum, frame)
+        self.handler(signum, frame)
+
+    def stop(self):
+        """
+        Stops the timer, restores the handler of the caller and its timer with the time it has left
+        """
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        if self.previous is not None:
+            signal.signal(signal.SIGALRM, self.previous)
+        if self.due is not None:
+            # Timer that came due while stopping fires right away
+            signal.setitimer(signal.ITIMER_REAL, max(self.due - time.monotonic(), 1e-6), self.period)
+            self.due = None
+
+
+def resident_memory() -> int:
+    """
+    Function measuring resident memory of the process, current on Linux (/proc), elsewhere its peak
+    Return: size in KiB
+    """
+    try:
+        with open('/proc/self/statm', 'rb') as statm:
+            return int(statm.read().split()[1]) * (os.sysconf('SC_PAGE_SIZE') >> 10)
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Profile:
+    """
+    Execution counts and wall time of instructions and of CALL chains, collected by engine run_profile
+    """
+    def __init__(self, instruction_list, memory, sample):
+        self.instruction_list = instruction_list
+        self.memory = memory
+        self.sample = sample  # Sampling interval in microseconds, 0 for timing of every instruction
+        self.counts = [0] * len(instruction_list)
+        self.times = [0.0] * len(instruction_list)
+        self.stacks = ['main']  # CALL chain, every item joins names of all labels called so far
+        self.folded = dict()  # Time or samples of every CALL chain and OPCODE
+
+    def wrap(self, instruct):
+        """
+        Binds instruction to its handler, CALL and RETURN get handlers that also update the CALL chain
+        :param instruct: Instruction
+        :return: callable with Memory as the only argument
+        """
+        handler = instruct.bind()
+        if instruct.opcode == 'CALL':
+            stack = ';' + instruct.get_args()[0].value
+
+            def call_handler(memory):
+                handler(memory)
+                self.stacks.append(self.stacks[-1] + stack)
+            return call_handler
+        if instruct.opcode == 'RETURN':
+            def return_handler(memory):
+                handler(memory)
+                if len(self.stacks) > 1:
+                    self.stacks.pop()
+            return return_handler
+        return handler
+
+    def add(self, index, elapsed, stack):
+        """
+        Adds time or sample to instruction and to its CALL chain
+        :param index: index of instruction
+        :param elapsed: seconds or 1 for sample
+        :param stack: CALL chain the instruction was executed in
+        """
+        self.times[index] += elapsed
+        key = stack + ';' + self.instruction_list[index].opcode
+        self.folded[key] = self.folded.get(key, 0) + elapsed
+
+    def sample_handler(self, signum, frame):
+        """Signal handler taking one sample of the running instruction"""
+        if self.memory.program_counter < len(self.instruction_list):
+            self.add(self.memory.program_counter, 1, self.stacks[-1])
+
+    def write(self, file):
+        """
+        Writes tables of instructions and OPCODEs to file and CALL chains in collapsed stack format to file.folded
+        :param file: file name
+        """
+        # Samples are converted to seconds, CALL chains are in microseconds or samples
+        scale = self.sample / 1e6 if self.sample else 1
+        times = [elapsed * scale for elapsed in self.times]
+        total = sum(times) or 1
+        opcodes = dict()
+        for instruct, count, elapsed in zip(self.instruction_list, self.counts, times):
+            opcode_count, opcode_time = opcodes.get(instruct.opcode, (0, 0.0))
+            opcodes[instruct.opcode] = (opcode_count + count, opcode_time + elapsed)
+        try:
+            with open(file, 'w') as report:
+                mode = 'sampled every %d us' % self.sample if self.sample else 'exact'
+                report.write('# %d instructions executed, %.6f s (%s)\n' % (sum(self.counts), sum(times), mode))
+                report.write('%10s %-12s %12s %12s %7s\n' % ('order', 'opcode', 'count', 'time s', 'time %'))
+                rows = sorted(zip(times, self.counts, self.instruction_list), key=lambda row: -row[0])
+                for elapsed, count, instruct in rows:
+                    if count:
+                        report.write('%10d %-12s %12d %12.6f %6.2f%%\n' % (
+                            instruct.order, instruct.opcode, count, elapsed, 100 * elapsed / total))
+                report.write('\n%-12s %12s %12s %7s\n' % ('opcode', 'count', 'time s', 'time %'))
+                for opcode, (count, elapsed) in sorted(opcodes.items(), key=lambda row: -row[1][1]):
+                    if count:
+                        report.write('%-12s %12d %12.6f %6.2f%%\n' % (opcode, count, elapsed, 100 * elapsed / total))
+            with open(file + '.folded', 'w') as folded:
+                for stack, elapsed in sorted(self.folded.items()):
+                    value = round(elapsed if self.sample else elapsed * 1e6)
+                    if value:
+                        folded.write('%s %d\n' % (stack, value))
+        except OSError:
+            error_exit(12, "Error 12: Can't write profile to file " + file)
+
+
+def site_reader(symb):
+    """
+    Function making reader of operand for specialized handlers of engine adaptive
+    Input: operand
+    Return: callable with Memory as the only argument returning Variable or UNDEFINED when the var or its frame
+    doesn't exist
+    """
+    slot, name = symb.slot, symb.frame
+    if name == 'GF':
+        return lambda memory: memory.frames['GF'][slot]
+    return lambda memory: UNDEFINED if memory.frames[name] is None else memory.frames[name][slot]
+
+
+class Quickening:
+    """
+    Adaptive specialization of instructions at run time, used by engine adaptive. Every site of an instruction from
+    QUICKENED counts its executions and after THRESHOLD of them its handler is replaced by a handler specialized
+    to the types of operands seen at that moment. The specialized handler checks the types by a guard, when the guard
+    fails the site goes back to the generic handler and counting starts again with doubled threshold
+    """
+    THRESHOLD = 16
+    MAX_BACKOFF = 12
+
+    def __init__(self, instruction_list, handlers):
+        self.instruction_list = instruction_list
+        self.handlers = handlers  # Handlers the engine executes, specialized handlers are put here
+        self.generic = list(handlers)
+        self.counts = [0] * len(instruction_list)  # Executions of generic handlers
+        self.hits = [0] * len(instruction_list)  # Executions of specialized handlers with passed guard
+        self.misses = [0] * len(instruction_list)  # Failed guards
+        self.backoff = [0] * len(instruction_list)
+        self.names = [None] * len(instruction_list)  # Last specialization of every site
+        for index, instruct in enumerate(instruction_list):
+            if instruct.opcode in QUICKENED and not instruct.typed:
+                handlers[index] = self.adaptive(index)
+
+    def adaptive(self, index):
+        """
+        Makes generic handler of a site that counts executions and specializes the site at the threshold
+        :param index: index of instruction
+        :return: callable with Memory as the only argument
+        """
+        generic = self.generic[index]
+        counts = self.counts
+        threshold = self.THRESHOLD << self.backoff[index]
+        start = counts[index]
+
+        def counting(memory):
+            counts[index] += 1
+            if counts[index] - start >= threshold:
+                self.specialize(index, memory)
+            generic(memory)
+        return counting
+
+    def specialize(self, index, memory):
+        """
+        Replaces handler of a site by handler specialized to current types of its operands. Types that would end with
+        an error are not specialized and the site keeps counting with doubled threshold
+        :param index: index of instruction
+        :param memory: Memory of the run
+        """
+        instruct = self.instruction_list[index]
+        symbs = instruct.get_args()[1:]
+        values = [memory.peek_value(symb) for symb in symbs]
+        types = [None if value is None else value.type for value in values]
+        if not proven(instruct.opcode, *types):
+            self.back_off(index)
+            return
+        self.names[index] = instruct.opcode + ''.join('_' + (TYPE_NAMES[known] if symb.type == 'var' else 'CONST')
+                                                      for symb, known in zip(symbs, types))
+        self.handlers[index] = self.specialized(index, *types)
+
+    def back_off(self, index):
+        """
+        Puts generic handler back to a site with doubled threshold
+        :param index: index of instruction
+        """
+        self.backoff[index] = min(self.backoff[index] + 1, self.MAX_BACKOFF)
+        self.handlers[index] = self.adaptive(index)
+
+    def deopt(self, index, memory):
+        """
+        Handles failed guard of specialized handler, the site goes back to the generic handler, which executes
+        the instruction
+        :param index: index of instruction
+        :param memory: Memory of the run
+        """
+        self.misses[index] += 1
+        self.back_off(index)
+        self.generic[index](memory)
+
+    def specialized(self, index, type1, type2):
+        """
+        Makes handler specialized to types of operands. Operands are read without errors, any var that isn't
+        defined or has other type fails the guard. Target var is checked like in the generic handler
+        :param index: index of instruction
+        :param type1: type of the first operand
+        :param type2: type of the second operand
+        :return: callable with Memory as the only argument
+        """
+        instruct = self.instruction_list[index]
+        opcode = instruct.opcode
+        target, symb1, symb2 = instruct.get_args()
+        # Constants are used right away, Variable is always true
+        const1 = None if symb1.type == 'var' else symb1
+        const2 = None if symb2.type == 'var' else symb2
+        read1 = site_reader(symb1) if const1 is None else None
+        read2 = site_reader(symb2) if const2 is None else None
+        deopt = partial(self.deopt, index)
+        hits = self.hits
+
+        if opcode in ('JUMPIFEQ', 'JUMPIFNEQ'):
+            jump_if_equal = opcode == 'JUMPIFEQ'
+
+            def jump(memory):
+                var1 = const1 or read1(memory)
+                var2 = const2 or read2(memory)
+                if var1 is UNDEFINED or var2 is UNDEFINED or var1.type != type1 or var2.type != type2:
+                    return deopt(memory)
+                hits[index] += 1
+                if (var1.value == var2.value) == jump_if_equal:
+                    memory.program_counter = target.target
+            return jump
+
+        operation = OPERATIONS[opcode]
+        result_type = RESULT_TYPES.get(opcode, type1)
+        division = opcode in ('IDIV', 'DIV')
+        slot = target.slot
+
+        def operation_site(memory):
+            var1 = const1 or read1(memory)
+            var2 = const2 or read2(memory)
+            if var1 is UNDEFINED or var2 is UNDEFINED or var1.type != type1 or var2.type != type2:
+                return deopt(memory)
+            hits[index] += 1
+            frame = memory.get_frame(target)
+            if frame[slot] is UNDEFINED: error_exit(54, "Error 54: Non-existent variable")
+            if division and var2.value == 0: error_exit(57, "Error 57: Zero division")
+            frame[slot] = Variable(result_type, operation(var1.value, var2.value))
+        return operation_site
+
+    def write(self, file):
+        """
+        Writes executions, hits and misses of specialized handlers of every site and the total hit rate
+        :param file: file name
+        """
+        sites = [index for index, instruct in enumerate(self.instruction_list)
+                 if instruct.opcode in QUICKENED and not instruct.typed]
+        hits = sum(self.hits[index] for index in sites)
+        executions = hits + sum(self.counts[index] for index in sites)
+        misses = sum(self.misses[index] for index in sites)
+        try:
+            with open(file, 'w') as report:
+                report.write('# %d of %d executions specialized (%.2f%%), %d guards failed, hit rate %.2f%%\n' % (
+                    hits, executions, 100 * hits / (executions or 1), misses, 100 * hits / ((hits + misses) or 1)))
+                report.write('%10s %-12s %-24s %12s %12s %8s %7s\n' % (
+                    'order', 'opcode', 'specialization', 'executions', 'hits', 'misses', 'hit %'))
+                for index in sites:
+                    instruct = self.instruction_list[index]
+                    site_hits = self.hits[index]
+                    report.write('%10d %-12s %-24s %12d %12d %8d %6.2f%%\n' % (
+                        instruct.order, instruct.opcode, self.names[index] or '-', site_hits + self.counts[index],
+                        site_hits, self.misses[index],
+                        100 * site_hits / ((site_hits + self.misses[index]) or 1)))
+        except OSError:
+            error_exit(12, "Error 12: Can't write statistics to file " + file)
+
+
+def fuse(parts):
+    """
+    Function joining handlers of a sequence of instructions into one superinstruction. Program counter is set
+    to the instruction of every handler before it is called, so errors, CALL and jumps behave as without fusion
+    Input: list of touples of index of instruction and its handler
+    Return: callable with Memory as the only argument
+    """
+    def fused(memory):
+        for index, handler in parts:
+            memory.program_counter = index
+            handler(memory)
+    return fused
+
+
+def fuse_stack_arithmetic(push1, push2, operation):
+    """
+    Superinstruction PUSHS a; PUSHS b; ADDS/SUBS/MULS/IDIVS, two ints are computed without the data stack
+    Input: the three Instructions
+    Return: callable with Memory as the only argument
+    """
+    handler1, handler2, handler3 = push1.bind(), push2.bind(), operation.bind()
+    symb1, symb2 = push1.get_args()[0], push2.get_args()[0]
+    opcode = operation.opcode
+
+    def fused(memory):
+        var1, var2 = memory.peek_value(symb1), memory.peek_value(symb2)
+        if var1 is None or var2 is None or var1.type != 'int' or var2.type != 'int' \
+                or (opcode == 'IDIVS' and var2.value == 0):
+            handler1(memory)
+            memory.program_counter += 1
+            handler2(memory)
+            memory.program_counter += 1
+            return handler3(memory)
+        match opcode:
+            case 'ADDS':
+                result = var1.value + var2.value
+            case 'SUBS':
+                result = var1.value - var2.value
+            case 'MULS':
+                result = var1.value * var2.value
+            case 'IDIVS':
+                result = var1.value // var2.value
+        memory.stack_types.append('int')
+        memory.stack_values.append(result)
+        memory.program_counter += 2
+    return fused
+
+
+def fuse_defvar_move(defvar, move):
+    """
+    Superinstruction DEFVAR x; MOVE x constant, the constant is stored right to the new var
+    Input: both Instructions
+    Return: callable with Memory as the only argument
+    """
+    handler = defvar.bind()
+    dest, symb = move.get_args()
+
+    def fused(memory):
+        handler(memory)
+        memory.get_frame(dest)[dest.slot] = Variable(symb.type, symb.value)
+        memory.program_counter += 1
+    return fused
+
+
+def fuse_compare_jump(compare, jump):
+    """
+    Superinstruction LT/GT/EQ t a b; JUMPIFEQ/JUMPIFNEQ label t constant, result of comparison is tested right
+    after it is stored
+    Input: both Instructions
+    Return: callable with Memory as the only argument
+    """
+    handler = compare.bind()
+    fallback = jump.bind()
+    dest = compare.get_args()[0]
+    label, _, symb = jump.get_args()
+    target = label.target
+    jump_if_equal = jump.opcode == 'JUMPIFEQ'
+
+    def fused(memory):
+        handler(memory)
+        memory.program_counter += 1
+        result = memory.get_frame(dest)[dest.slot]
+        if result.type != symb.type:
+            return fallback(memory)
+        if (result.value == symb.value) == jump_if_equal:
+            memory.program_counter = target
+    return fused
+
+
+def typed_handler(instruct):
+    """
+    Handler of instruction whose operand types were proven by infer_types(). Operands are constants or GF vars that
+    are always defined, so they are read by slot and their types are not checked. Other checks and errors are the same
+    as in the method of the instruction
+    Input: Instruction
+    Return: callable with Memory as the only argument
+    """
+    opcode = instruct.opcode
+    target, *symbs = instruct.get_args()
+    # Slot of GF var or constant of every operand
+    (slot1, const1), (slot2, const2) = [(symb.slot, None) if symb.type == 'var' else (None, symb)
+                                        for symb in symbs] + [(None, None)] * (2 - len(symbs))
+
+    def operands(memory):
+        frame = memory.frames['GF']
+        return (const1 if slot1 is None else frame[slot1]), (const2 if slot2 is None else frame[slot2])
+
+    if opcode in ('JUMPIFEQ', 'JUMPIFNEQ'):
+        jump_if_equal = opcode == 'JUMPIFEQ'
+
+        def jump(memory):
+            var1, var2 = operands(memory)
+            if (var1.value == var2.value) == jump_if_equal:
+                memory.program_counter = target.target
+        return jump
+
+    def dest(memory):
+        if not memory.check_var_exists(target): error_exit(54, "Error 54: Non-existent variable")
+
+    match opcode:
+        case 'ADD' | 'SUB' | 'MUL' | 'IDIV' | 'DIV':
+            operation = OPERATIONS[opcode]
+            division = opcode in ('IDIV', 'DIV')
+
+            def arithmetic(memory):
+                dest(memory)
+                var1, var2 = operands(memory)
+                if division and var2.value == 0: error_exit(57, "Error 57: Zero division")
+                memory.set_var(target, var1.type, operation(var1.value, var2.value))
+            return arithmetic
+        case 'LT' | 'GT' | 'EQ' | 'AND' | 'OR':
+            operation = OPERATIONS[opcode]
+
+            def relational(memory):
+                dest(memory)
+                var1, var2 = operands(memory)
+                memory.set_var(target, 'bool', operation(var1.value, var2.value))
+            return relational
+        case 'NOT':
+            def not_ins(memory):
+                dest(memory)
+                memory.set_var(target, 'bool', not operands(memory)[0].value)
+            return not_ins
+        case 'CONCAT':
+            def concat(memory):
+                dest(memory)
+                var1, var2 = operands(memory)
+                # Appending to the same var extends its buffer instead of copying it
+                if memory.get_frame(target)[target.slot] is var1:
+                    string_buffer(memory, target, var1).append(var2.value)
+                    return
+                memory.set_var(target, 'string', var1.value + var2.value)
+            return concat
+        case 'STRLEN':
+            def strlen(memory):
+                dest(memory)
+                memory.set_var(target, 'int', operands(memory)[0].length())
+            return strlen
+
+
+def same_var(var1, var2) -> bool:
+    """
+    Function checking if two operands are the same var
+    Input: two operands
+    Return: bool
+    """
+    return var1.type == 'var' and var2.type == 'var' and var1.frame == var2.frame and var1.name == var2.name
+
+
+def entry(instruction_list, index) -> bool:
+    """
+    Function checking if execution can start at given instruction other way than from the previous one, which is
+    after LABEL (target of jumps) and after CALL (target of RETURN)
+    Input: list of Instructions, index
+    Return: bool
+    """
+    return instruction_list[index].opcode == 'LABEL' or instruction_list[index - 1].opcode == 'CALL'
+
+
+def peephole(instruction_list, handlers):
+    """
+    Function replacing handlers of common sequences of instructions with superinstructions. Superinstruction
+    replaces the handler of the first instruction of the sequence and moves program counter to its last
+    instruction, handlers of the other instructions stay, so statistics and errors are the same. Sequences never
+    contain an instruction where execution can enter in the middle
+    Input: list of Instructions, list of their handlers
+    """
+    def opcodes(index, count):
+        if any(entry(instruction_list, i) for i in range(index + 1, min(index + count, len(instruction_list)))):
+            return ()
+        return tuple(instruct.opcode for instruct in instruction_list[index:index + count])
+
+    for index, instruct in enumerate(instruction_list):
+        sequence = instruction_list[index:index + 5]
+        if opcodes(index, 3)[:2] == ('PUSHS', 'PUSHS') and \
+                opcodes(index, 3)[2:] in (('ADDS',), ('SUBS',), ('MULS',), ('IDIVS',)):
+            handlers[index] = fuse_stack_arithmetic(*sequence[:3])
+        elif opcodes(index, 2) == ('DEFVAR', 'MOVE') and \
+                same_var(instruct.get_args()[0], sequence[1].get_args()[0]) and sequence[1].get_args()[1].type != 'var':
+            handlers[index] = fuse_defvar_move(*sequence[:2])
+        elif opcodes(index, 2)[:1] in (('LT',), ('GT',), ('EQ',)) and \
+                opcodes(index, 2)[1:] in (('JUMPIFEQ',), ('JUMPIFNEQ',)) and \
+                same_var(instruct.get_args()[0], sequence[1].get_args()[1]) and sequence[1].get_args()[2].type != 'var':
+            handlers[index] = fuse_compare_jump(*sequence[:2])
+        elif instruct.opcode == 'CREATEFRAME':
+            # CREATEFRAME; DEFVAR TF@x; MOVE TF@x symb; ...; PUSHFRAME; CALL label
+            parts = [(index, instruct.bind())]
+            last = index + 1
+            while opcodes(last, 2) == ('DEFVAR', 'MOVE') and \
+                    same_var(instruction_list[last].get_args()[0], instruction_list[last + 1].get_args()[0]):
+                if instruction_list[last + 1].get_args()[1].type != 'var':
+                    parts.append((last, fuse_defvar_move(instruction_list[last], instruction_list[last + 1])))
+                else:
+                    parts.extend(((last, instruction_list[last].bind()), (last + 1, instruction_list[last + 1].bind())))
+                last += 2
+            if opcodes(index, last - index + 2)[-2:] == ('PUSHFRAME', 'CALL'):
+                parts.extend(((last, instruction_list[last].bind()), (last + 1, instruction_list[last + 1].bind())))
+                handlers[index] = fuse(parts)
+
+
+class Limits:
+    """
+    Limits of one run: number of executed instructions, memory taken by the run and wall time. Instructions are
+    counted by the loop of the engine, memory and time are checked by a timer every INTERVAL seconds, so the program
+    itself doesn't pay for them. Memory is the growth of resident memory of the process since the start of the run,
+    so the interpreter, the loaded program and in the daemon its cached programs don't count. Exceeded limit ends
+    the program with its error code and names the instruction
+    """
+    INTERVAL = 0.01
+
+    def __init__(self, max_steps=None, max_memory=None, timeout=None):
+        self.max_steps = max_steps
+        self.max_memory = max_memory  # MiB
+        self.timeout = timeout  # Seconds
+        self.instruction_list = None
+        self.memory = None
+        self.deadline = None
+        self.baseline = 0  # Resident memory in KiB at the start of the run
+        self.alarm = None  # Alarm while the timer runs
+        self.lines = None  # Index of instruction of every line of code generated by engine python
+
+    def start(self, instruction_list, memory):
+        """
+        Starts the timer checking memory and time of a run
+        :param instruction_list: list of Instructions of the run
+        :param memory: Memory of the run
+        """
+        self.instruction_list = instruction_list
+        self.memory = memory
+        if self.max_memory is None and self.timeout is None:
+            return
+        interval = self.INTERVAL
+        if self.max_memory is not None:
+            self.baseline = resident_memory()
+        if self.timeout is not None:
+            self.deadline = time.monotonic() + self.timeout
+            interval = min(interval, self.timeout)
+        self.alarm = Alarm(self.tick, interval)
+
+    def stop(self):
+        """
+        Stops the timer and restores the timer of the caller
+        """
+        alarm, self.alarm = self.alarm, None
+        if alarm is not None:
+            alarm.stop()
+
+    def tick(self, signum, frame):
+        """
+        Handler of SIGALRM checking the deadline and memory of the process
+        :param signum: number of the signal
+        :param frame: interrupted frame
+        """
+        if self.alarm is None:
+            return  # The timer is being stopped
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            code, limit = 62, '%g s of wall time' % self.timeout
+        elif self.max_memory is not None and resident_memory() - self.baseline > self.max_memory << 10:
+            code, limit = 61, '%d MiB of memory' % self.max_memory
+        else:
+            return
+        # The error can come anywhere, even while the engine stops the timer, so the timer is stopped right here
+        self.stop()
+        self.exceeded(code, limit, self.locate(frame))
+
+    def locate(self, frame) -> int:
+        """
+        Finds index of the running instruction, code generated by engine python and the loop of engine python
+        are found among the interrupted frames, other engines and the last block of engine python run by
+        run_handlers() keep the program counter
+        :param frame: interrupted frame
+        :return: index of instruction
+        """
+        while self.lines is not None and frame is not None:
+            if frame.f_code.co_filename == '<ippcode23>' and self.lines[frame.f_lineno - 1] is not None:
+                return self.lines[frame.f_lineno - 1]
+            if frame.f_code is run_handlers.__code__:
+                break
+            if frame.f_code is run_python.__code__:
+                return frame.f_locals['index']
+            frame = frame.f_back
+        return self.memory.program_counter
+
+    def exceeded(self, code, limit, index):
+        """
+        Ends the program because of exceeded limit
+        :param code: return code
+        :param limit: text of the limit
+        :param index: index of instruction the limit fired on
+        """
+        if not 0 <= index < len(self.instruction_list):
+            error_exit(code, "Error %d: Limit of %s exceeded at the end of the program" % (code, limit))
+        instruct = self.instruction_list[index]
+        error_exit(code, "Error %d: Limit of %s exceeded at order %d (%s)" % (code, limit, instruct.order,
+                                                                            instruct.source()))
+
+
+def counts_steps(limits) -> bool:
+    """
+    Function telling if a run counts executed instructions. Such run doesn't use superinstructions, which execute
+    more instructions in one step of the engine loop
+    Input: Limits or None
+    Return: bool
+    """
+    return limits is not None and limits.max_steps is not None
+
+
+def run_handlers(handlers, memory, limits=None, steps=None):
+    """
+    Function executing handlers by program counter until the end of the program. With limit of steps the loop
+    runs at most given number of times, the limit is checked by iterating over repeat() with no code added
+    to every step
+    Input: list of handlers, Memory of the run, Limits or None, steps left of the limit when the run is already
+    going, the whole limit by default
+    """
+    end = len(handlers)
+    if not counts_steps(limits):
+        while memory.program_counter != end:
+            handlers[memory.program_counter](memory)
+            memory.program_counter += 1
+        return
+    for _ in repeat(None, limits.max_steps if steps is None else steps):
+        if memory.program_counter == end:
+            return
+        handlers[memory.program_counter](memory)
+        memory.program_counter += 1
+    if memory.program_counter != end:
+        limits.exceeded(60, '%d steps' % limits.max_steps, memory.program_counter)
+
+
+def run_switch(instruction_list, memory, optimize=(), limits=None):
+    """
+    Engine executing instructions through match case in instr_switch, optimizations of handlers don't apply
+    Input: list of Instructions, Memory of the run, names of optimizations, Limits or None
+    """
+    if counts_steps(limits):
+        run_handlers([instruct.instr_switch for instruct in instruction_list], memory, limits)
+        return
+    while memory.program_counter != len(instruction_list):
+        Instruction.instr_switch(instruction_list[memory.program_counter], memory)
+        memory.program_counter += 1
+
+
+def run_table(instruction_list, memory, optimize=(), limits=None):
+    """
+    Engine executing instructions through handlers bound to them before execution
+    Input: list of Instructions, Memory of the run, names of optimizations, Limits or None
+    """
+    handlers = [instruct.bind() for instruct in instruction_list]
+    if 'peephole' in optimize and not counts_steps(limits):
+        peephole(instruction_list, handlers)
+    run_handlers(handlers, memory, limits)
+
+
+def run_stats(instruction_list, memory, groups):
+    """
+    Engine executing instructions like engine table while collecting statistics, statistics are written
+    at the end of the program and after EXIT
+    Input: list of Instructions, Memory of the run, groups of statistics from argument_parse()
+    """
+    stats = Stats(instruction_list)
+    handlers = [stats.wrap(instruct) for instruct in instruction_list]
+    counts = stats.counts
+    end = len(handlers)
+    try:
+        while memory.program_counter != end:
+            counts[memory.program_counter] += 1
+            handlers[memory.program_counter](memory)
+            memory.program_counter += 1
+    except ProgramExit as exit_inst:
+        # Runtime errors have codes from 50 up, lower codes come from EXIT
+        if exit_inst.code < 50:
+            stats.write(groups)
+        raise
+    stats.write(groups)
+
+
+def run_profile(instruction_list, memory, file, sample):
+    """
+    Engine executing instructions like engine table while measuring them, profile is written when the program
+    ends in any way
+    Input: list of Instructions, Memory of the run, file for profile, sampling interval in microseconds or 0 for
+    exact timing
+    """
+    profile = Profile(instruction_list, memory, sample)
+    handlers = [profile.wrap(instruct) for instruct in instruction_list]
+    counts = profile.counts
+    end = len(handlers)
+    alarm = None  # Sampling timer, keeps the timer of the caller
+    try:
+        if sample:
+            alarm = Alarm(profile.sample_handler, sample / 1e6)
+            while memory.program_counter != end:
+                counts[memory.program_counter] += 1
+                handlers[memory.program_counter](memory)
+                memory.program_counter += 1
+        else:
+            clock = time.perf_counter
+            add = profile.add
+            stacks = profile.stacks
+            while memory.program_counter != end:
+                index = memory.program_counter
+                counts[index] += 1
+                stack = stacks[-1]
+                start = clock()
+                try:
+                    handlers[index](memory)
+                finally:
+                    add(index, clock() - start, stack)
+                memory.program_counter += 1
+    finally:
+        if alarm is not None:
+            alarm.stop()
+        profile.write(file)
+
+
+def python_constants(instruction_list) -> dict:
+    """
+    Function collecting constant operands of a program for generated code, shared constants are collected once
+    Input: list of Instructions
+    Return: dictionary of id of constant to touple of its number and the constant
+    """
+    constants = dict()
+    for instruct in instruction_list:
+        for arg in instruct.get_args():
+            if arg.type not in ('var', 'label', 'type') and id(arg) not in constants:
+                constants[id(arg)] = (len(constants), arg)
+    return constants
+
+
+def python_read(symb, name, constants):
+    """
+    Function generating code reading operand of an instruction into a local name of generated code
+    Input: operand, local name, constants from python_constants()
+    Return: touple of lines of code and operand, that is touple of its name and type of constant or None for var
+    """
+    if symb.type != 'var':
+        return [], ('c%d' % constants[id(symb)][0], symb.type)
+    match symb.frame:
+        case 'GF':
+            line = '%s = GF[%d]' % (name, symb.slot)
+        case _:
+            line = "%s = R[%d] if (R := frames['%s']) is not None else UNDEFINED" % (name, symb.slot, symb.frame)
+    return [line], (name, None)
+
+
+def python_dest(var):
+    """
+    Function generating code finding the slot of target var of an instruction
+    Input: Reference
+    Return: touple of lines of code, condition that the frame exists and expression of the slot, or None
+    for unknown frame
+    """
+    match var.frame:
+        case 'GF':
+            return [], True, 'GF[%d]' % var.slot
+        case 'TF' | 'LF':
+            return ["F = frames['%s']" % var.frame], 'F is not None', 'F[%d]' % var.slot
+    return None
+
+
+def python_type_is(operand, types):
+    """
+    Function generating condition that operand has one of given types, types of constants are checked right away
+    Input: operand from python_read(), touple of types
+    Return: string with condition or bool
+    """
+    name, known = operand
+    if known is not None:
+        return known in types
+    if len(types) == 1:
+        return '%s.type == %r' % (name, types[0])
+    return '%s.type in %r' % (name, types)
+
+
+def python_same_type(operand1, operand2):
+    """
+    Function generating condition that two operands have the same type
+    Input: two operands from python_read()
+    Return: string with condition or bool
+    """
+    if operand1[1] is not None and operand2[1] is not None:
+        return operand1[1] == operand2[1]
+    if operand1[1] is not None:
+        return python_type_is(operand2, (operand1[1],))
+    if operand2[1] is not None:
+        return python_type_is(operand1, (operand2[1],))
+    return '%s.type == %s.type' % (operand1[0], operand2[0])
+
+
+def python_any(*conditions):
+    """
+    Function joining conditions by or, conditions known when the code is generated are left out
+    Input: strings with conditions or bools
+    Return: string with condition or bool
+    """
+    if True in conditions:
+        return True
+    conditions = [condition for condition in conditions if condition is not False]
+    if not conditions:
+        return False
+    return '(' + ' or '.join(conditions) + ')'
+
+
+def python_instruction(instruct, index, constants) -> list:
+    """
+    Function translating one instruction into Python code. Common cases of simple instructions are executed by
+    inline code guarded by conditions under which the handler of the instruction can't end with an error, every
+    other case calls the handler of the instruction, so results and errors are the same as with other engines
+    Input: Instruction, its index, constants from python_constants()
+    Return: list of lines of code
+    """
+    args = instruct.get_args()
+    fallback = ['memory.program_counter = %d' % index, 'H[%d](memory)' % index]
+    # Jumps continue after their LABEL, which isn't a step like in engine table, RETURN after its CALL
+    if instruct.opcode in BRANCHES:
+        fallback.append('return %d if memory.program_counter == %d else memory.program_counter + 1'
+                        % (index + 1, index))
+    elif instruct.opcode in ('RETURN', 'EXIT'):
+        fallback.append('return memory.program_counter + 1')
+    match instruct.opcode:
+        case 'LABEL' | 'BREAK':
+            return []
+        case 'JUMP':
+            return ['return %d' % (args[0].target + 1)]
+        case 'CALL':
+            return ['call_stack.append(%d)' % index, 'return %d' % (args[0].target + 1)]
+        case 'RETURN':
+            return ['if call_stack:', '    return call_stack.pop() + 1'] + fallback
+        case 'DEFVAR':
+            dest = python_dest(args[0])
+            if dest is None:
+                return fallback
+            lines, frame, slot = dest
+            conditions = [frame, '%s is UNDEFINED' % slot]
+            body = ['%s = UNINITIALIZED' % slot]
+            return python_guard(lines, conditions, body, fallback)
+        case 'MOVE' | 'ADD' | 'SUB' | 'MUL' | 'IDIV' | 'DIV' | 'LT' | 'GT' | 'EQ' | 'AND' | 'OR' | 'NOT':
+            dest = python_dest(args[0])
+            if dest is None:
+                return fallback
+            lines, frame, slot = dest
+            conditions = [frame, '%s is not UNDEFINED' % slot]
+            first = 1
+        case 'JUMPIFEQ' | 'JUMPIFNEQ':
+            lines, conditions, first = list(), list(), 1
+        case 'WRITE' | 'PUSHS':
+            lines, conditions, first = list(), list(), 0
+        case _:
+            return fallback
+
+    # Operand types of typed instructions are proven, only checks of other errors stay
+    checks = list() if instruct.typed else conditions
+    operands = list()
+    for symb, name in zip(args[first:], ('a', 'b')):
+        read, operand = python_read(symb, name, constants)
+        lines.extend(read)
+        if operand[1] is None:
+            checks.append('%s is not UNDEFINED' % name)
+        operands.append(operand)
+
+    match instruct.opcode:
+        case 'MOVE':
+            body = ['%s = Variable(%s.type, %s.value)' % (slot, operands[0][0], operands[0][0])]
+        case 'ADD' | 'SUB' | 'MUL' | 'IDIV' | 'DIV':
+            a, b = operands
+            types = ('float',) if instruct.opcode == 'DIV' else ('int', 'float')
+            checks.extend((python_same_type(a, b), python_type_is(a, types)))
+            symbol = {'ADD': '+', 'SUB': '-', 'MUL': '*', 'IDIV': '//', 'DIV': '/'}[instruct.opcode]
+            if instruct.opcode in ('IDIV', 'DIV'):
+                conditions.append('%s.value != 0' % b[0])
+            body = ['%s = Variable(%s.type, %s.value %s %s.value)' % (slot, a[0], a[0], symbol, b[0])]
+        case 'LT' | 'GT' | 'EQ':
+            a, b = operands
+            if instruct.opcode == 'EQ':
+                checks.append(python_any(python_same_type(a, b), python_type_is(a, ('nil',)),
+                                         python_type_is(b, ('nil',))))
+            else:
+                checks.extend((python_same_type(a, b), python_type_is(a, ('int', 'float', 'string', 'bool'))))
+            symbol = {'LT': '<', 'GT': '>', 'EQ': '=='}[instruct.opcode]
+            body = ["%s = Variable('bool', %s.value %s %s.value)" % (slot, a[0], symbol, b[0])]
+        case 'AND' | 'OR':
+            a, b = operands
+            checks.extend((python_type_is(a, ('bool',)), python_type_is(b, ('bool',))))
+            body = ["%s = Variable('bool', %s.value %s %s.value)" % (slot, a[0], instruct.opcode.lower(), b[0])]
+        case 'NOT':
+            checks.append(python_type_is(operands[0], ('bool',)))
+            body = ["%s = Variable('bool', not %s.value)" % (slot, operands[0][0])]
+        case 'JUMPIFEQ' | 'JUMPIFNEQ':
+            a, b = operands
+            checks.append(python_any(python_same_type(a, b), python_type_is(a, ('nil',)),
+                                     python_type_is(b, ('nil',))))
+            symbol = '==' if instruct.opcode == 'JUMPIFEQ' else '!='
+            body = ['if %s.value %s %s.value:' % (a[0], symbol, b[0]), '    return %d' % (args[0].target + 1),
+                    'return %d' % (index + 1)]
+        case 'WRITE':
+            body = ['write(%s.text())' % operands[0][0]]
+        case 'PUSHS':
+            body = ['stack_types.append(%s.type)' % operands[0][0], 'stack_values.append(%s.value)' % operands[0][0]]
+    return python_guard(lines, conditions, body, fallback)
+
+
+def python_guard(lines, conditions, body, fallback) -> list:
+    """
+    Function joining code of an instruction, its inline code runs only when all conditions hold and the handler
+    is called otherwise
+    Input: lines reading operands, conditions as strings or bools, lines of inline code, lines calling handler
+    Return: list of lines of code
+    """
+    if False in conditions:
+        return fallback
+    conditions = [condition for condition in conditions if condition is not True]
+    if not conditions:
+        return lines + body
+    return lines + ['if %s:' % ' and '.join(conditions)] + ['    ' + line for line in body] + \
+        ['else:'] + ['    ' + line for line in fallback]
+
+
+def python_source(instruction_list):
+    """
+    Function translating program into source of Python function program(memory, H, K), that returns list of
+    functions of basic blocks indexed by their first instruction, a block starting with LABEL is also indexed by
+    the next instruction, where jumps continue. Function of a block returns index of the next block to execute.
+    Handlers of instructions are given in list H and constants in list K
+    Input: list of Instructions
+    Return: string with Python source
+    """
+    constants = python_constants(instruction_list)
+    lines = ['def program(memory, H, K):', "    frames = memory.frames", "    GF = frames['GF']",
+             '    call_stack = memory.call_stack', '    stack_types = memory.stack_types',
+             '    stack_values = memory.stack_values', '    write = memory.output.write']
+    lines.extend('    c%d = K[%d]  # %s' % (number, number, arg.source()) for number, arg in constants.values())
+
+    blocks = basic_blocks(instruction_list)
+    for start, end, _ in blocks:
+        lines.append('')
+        lines.append('    def block_%d():' % start)
+        for index in range(start, end):
+            instruct = instruction_list[index]
+            lines.append('        # %d: %s' % (index, instruct.source()))
+            lines.extend('        ' + line for line in python_instruction(instruct, index, constants))
+        last = instruction_list[end - 1].opcode
+        if last not in BRANCHES and last not in ('RETURN', 'EXIT'):
+            lines.append('        return %d' % end)
+
+    lines.append('')
+    lines.append('    blocks = [None] * %d' % len(instruction_list))
+    lines.extend('    blocks[%d] = block_%d' % (start, start) for start, _, _ in blocks)
+    lines.extend('    blocks[%d] = block_%d' % (start + 1, start) for start, end, _ in blocks
+                 if instruction_list[start].opcode == 'LABEL' and end - start > 1)
+    lines.append('    return blocks')
+    return '\n'.join(lines) + '\n'
+
+
+def run_python(instruction_list, memory, optimize=(), limits=None):
+    """
+    Engine executing program translated by python_source() and compiled by compile(), one Python call executes
+    a whole basic block. Limit of steps is checked before every block with its number of instructions, a block
+    that doesn't fit into the remaining steps runs instruction by instruction, so the limit fires on the same
+    instruction as in other engines
+    Input: list of Instructions, Memory of the run, names of optimizations, Limits or None
+    """
+    source = python_source(instruction_list)
+    namespace = {'UNDEFINED': UNDEFINED, 'UNINITIALIZED': UNINITIALIZED, 'Variable': Variable}
+    exec(compile(source, '<ippcode23>', 'exec'), namespace)
+    constants = [arg for _, arg in python_constants(instruction_list).values()]
+    handlers = [instruct.bind() for instruct in instruction_list]
+    blocks = namespace['program'](memory, handlers, constants)
+    index = 0
+    end = len(blocks)
+    if limits is not None:
+        # Timer of limits finds the running instruction by comments "# index: instruction" and names of functions
+        # of blocks in generated code, between blocks by variable index of this function
+        limits.lines = list()
+        current = None
+        for line in source.split('\n'):
+            comment = re.match(r'\s*(?:# |def block_)(\d+)', line)
+            if comment:
+                current = int(comment.group(1))
+            limits.lines.append(current)
+    if not counts_steps(limits):
+        while index != end:
+            index = blocks[index]()
+        return
+
+    sizes = [0] * end
+    for start, stop, _ in basic_blocks(instruction_list):
+        sizes[start] = stop - start
+        # Block entered by a jump skips its LABEL
+        if instruction_list[start].opcode == 'LABEL' and stop - start > 1:
+            sizes[start + 1] = stop - start - 1
+    steps = limits.max_steps
+    while index != end:
+        if sizes[index] > steps:
+            memory.program_counter = index
+            run_handlers(handlers, memory, limits, steps)
+            return
+        steps -= sizes[index]
+        index = blocks[index]()
+
+
+def run_adaptive(instruction_list, memory, optimize=(), limits=None, report=None):
+    """
+    Engine executing instructions like engine table while specializing hot instructions to types of their operands,
+    report of specialization is written when the program ends in any way
+    Input: list of Instructions, Memory of the run, names of optimizations, Limits or None, file for report or None
+    """
+    handlers = [instruct.bind() for instruct in instruction_list]
+    if 'peephole' in optimize and not counts_steps(limits):
+        peephole(instruction_list, handlers)
+    quickening = Quickening(instruction_list, handlers)
+    try:
+        run_handlers(handlers, memory, limits)
+    finally:
+        if report is not None:
+            quickening.write(report)
+
+
+ENGINES = {
+    'switch': run_switch,
+    'table': run_table,
+    'python': run_python,
+    'adaptive': run_adaptive,
+}
+
+
+class Program:
+    """
+    Compiled program, it can be run any number of times and every run has its own Memory
+    """
+    def __init__(self, instruction_list, global_slots, local_slots, optimize=()):
+        self.instruction_list = optimize_program(instruction_list, optimize)
+        self.global_slots = global_slots
+        self.local_slots = local_slots
+        self.optimize = optimize
+
+    def run(self, input_handle=None, output=None, errors=None, engine='table', stats=None, profile=None,
+            profile_sample=0, adaptive_stats=None, limits=None) -> int:
+        """
+        Runs the program, errors of the program are returned as its return code
+        :param input_handle: InputReader, text file or string read by READ, stdin by default
+        :param output: text file written by WRITE, stdout by default
+        :param errors: text file for error messages and DPRINT, stderr by default
+        :param engine: name of engine from ENGINES
+        :param stats: groups of statistics from argument_parse()
+        :param profile: file for profile
+        :param profile_sample: sampling interval of profile in microseconds or 0 for exact timing
+        :param adaptive_stats: file for report of engine adaptive
+        :param limits: Limits of the run or None
+        :return: return code
+        """
+        if input_handle is None:
+            input_handle = open_input(None)
+        elif isinstance(input_handle, str):
+            input_handle = InputReader(io.BytesIO(input_handle.encode()), 'utf-8')
+        memory = Memory(self.global_slots, self.local_slots, input_handle, sys.stdout if output is None else output,
+                        sys.stderr if errors is None else errors)
+        code, message = 0, None
+        try:
+            if limits is not None:
+                limits.start(self.instruction_list, memory)
+            try:
+                if profile is not None:
+                    run_profile(self.instruction_list, memory, profile, profile_sample)
+                elif stats:
+                    run_stats(self.instruction_list, memory, stats)
+                elif engine == 'adaptive':
+                    run_adaptive(self.instruction_list, memory, self.optimize, limits, adaptive_stats)
+                else:
+                    ENGINES[engine](self.instruction_list, memory, self.optimize, limits)
+            finally:
+                if limits is not None:
+                    limits.stop()
+        except ProgramExit as end:
+            code, message = end.code, end.message
+        memory.output.flush()
+        if message is not None:
+            memory.errors.write(message + '\n')
+        return code
+
+    def dump(self, output):
+        """
+        Writes the program after optimizations as IPPcode23
+        :param output: text file
+        """
+        output.write('.IPPcode23\n')
+        if 'types' in self.optimize:
+            checked = [instruct for instruct in self.instruction_list if instruct.opcode in TYPED]
+            output.write('# types: %d of %d type checks eliminated\n' % (
+                sum(instruct.typed for instruct in checked), len(checked)))
+        for instruct in self.instruction_list:
+            output.write('%-60s # order %d%s\n' % (instruct.source(), instruct.order,
+                                                    ', typed' if instruct.typed else ''))
+
+    def dump_python(self, output):
+        """
+        Writes Python source the program is translated to by engine python
+        :param output: text file
+        """
+        output.write(python_source(self.instruction_list))
+
+
+def compile_program(source, optimize=(), source_format='xml'):
+    """
+    Function loading source into a Program that can be run repeatedly
+    Input: source as bytes or binary file, names of optimizations, format of source
+    Return: Program
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return Program(*load_program(source, source_format), optimize)
+
+
+def execute(program, argument, input_handle, output, errors) -> int:
+    """
+    Function running compiled program as the options of command line say, dump modes only write the program
+    Input: Program, namespace from argument_parse(), InputReader, text file for output and for errors
+    Return: return code
+    """
+    if argument.dump:
+        program.dump(output)
+        return 0
+    if argument.dump_python:
+        program.dump_python(output)
+        return 0
+    limits = None
+    if (argument.max_steps, argument.max_memory, argument.timeout) != (None, None, None):
+        limits = Limits(argument.max_steps, argument.max_memory, argument.timeout)
+    return program.run(input_handle, output, errors, argument.engine, argument.stats, argument.profile,
+                       argument.profile_sample, argument.adaptive_stats, limits)
+
+
+def read_frames(connection, count) -> list:
+    """
+    Function reading messages of the daemon protocol, every frame is 8 bytes of its length and its bytes
+    Input: connected socket, number of frames
+    Return: list of bytes
+    """
+    import struct
+    stream = connection.makefile('rb')
+    frames = list()
+    for _ in range(count):
+        head = stream.read(8)
+        if len(head) != 8:
+            raise ConnectionError('connection closed')
+        size, = struct.unpack('>Q', head)
+        frames.append(stream.read(size))
+        if len(frames[-1]) != size:
+            raise ConnectionError('connection closed')
+    return frames
+
+
+def write_frames(connection, frames):
+    """
+    Function writing frames of the daemon protocol
+    Input: connected socket, list of bytes
+    """
+    import struct
+    connection.sendall(b''.join(struct.pack('>Q', len(frame)) + frame for frame in frames))
+
+
+def write_response(connection, code, output=b'', errors=b''):
+    """
+    Function writing response of the daemon, that is JSON header with return code, output and errors of the run
+    Input: connected socket, return code, output and errors as bytes
+    """
+    import json
+    write_frames(connection, [json.dumps({'code': code}).encode(), output, errors])
+
+
+def program_size(program) -> int:
+    """
+    Function estimating memory taken by compiled program, from sizes of instructions and their operands
+    Input: Program
+    Return: size in bytes
+    """
+    size = sys.getsizeof(program.instruction_list)
+    for instruct in program.instruction_list:
+        size += sys.getsizeof(instruct) + sys.getsizeof(instruct.args)
+        for arg in instruct.args:
+            size += sys.getsizeof(arg) + sys.getsizeof(getattr(arg, 'value', None))
+    return size
+
+
+class ProgramCache:
+    """
+    Compiled programs of the daemon in LRU order, the least recently used programs are dropped when their sizes
+    exceed the limit
+    """
+    def __init__(self, limit):
+        self.limit = limit
+        self.programs = dict()  # Key: (Program, size), dict keeps order of use
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Returns cached program and marks it as the most recently used
+        :param key: key of the program
+        :return: Program or None
+        """
+        entry = self.programs.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.programs[key] = entry
+        return entry[0]
+
+    def put(self, key, program):
+        """
+        Stores compiled program, program larger than the whole limit is not stored
+        :param key: key of the program
+        :param program: Program
+        """
+        size = program_size(program)
+        if size > self.limit:
+            return
+        while self.programs and self.size + size > self.limit:
+            _, dropped = self.programs.pop(next(iter(self.programs)))
+            self.size -= dropped
+        self.programs[key] = (program, size)
+        self.size += size
+
+
+def serve_request(connection, cache):
+    """
+    Function handling one request of the daemon. Request is JSON header with options of interpret.py, path of
+    source or None and path of input or None, followed by source and input as bytes when their paths are None.
+    Program is compiled or taken from the cache and run in a forked process, so every run starts from fresh state
+    and can't change the daemon
+    Input: connected socket, ProgramCache
+    """
+    import hashlib
+    import json
+    try:
+        connection.settimeout(REQUEST_TIMEOUT)
+        header, source, data = read_frames(connection, 3)
+        request = json.loads(header)
+        connection.settimeout(None)
+    except (ConnectionError, TimeoutError, ValueError):
+        return
+
+    messages = io.StringIO()
+    input_handle = pid = None
+    try:
+        # Source and input come with the request, --source only satisfies the check of arguments
+        with redirect_stderr(messages):
+            argument = argument_parse(request['options'] + ['--source=' + (request['source'] or '-')])
+        if request['input'] is not None:
+            input_handle = open_input(request['input'])
+        else:
+            input_handle = InputReader(io.BytesIO(data), locale.getpreferredencoding(False))
+        if request['source'] is not None:
+            try:
+                with open(request['source'], 'rb') as source_file:
+                    source = source_file.read()
+            except OSError:
+                error_exit(11, "Error 11: File " + request['source'] + " does not exist")
+        optimize = () if argument.stats else argument.optimize
+        key = (hashlib.sha256(source).digest(), argument.source_format, optimize)
+        program = cache.get(key)
+        if program is None:
+            program = compile_program(source, optimize, argument.source_format)
+            cache.put(key, program)
+        pid = os.fork()
+    except ProgramExit as end:
+        write_response(connection, end.code, errors=(end.message + '\n').encode())
+        return
+    except SystemExit as end:
+        # Usage errors of argparse
+        write_response(connection, end.code, errors=messages.getvalue().encode())
+        return
+    finally:
+        # Input is read only by the forked run, the daemon closes it also when the request fails
+        if input_handle is not None and pid != 0:
+            input_handle.close()
+
+    if pid:
+        return
+    code = 99
+    try:
+        # Garbage collection of the run doesn't touch objects of the daemon, so their pages stay shared
+        gc.freeze()
+        output, errors = io.StringIO(), io.StringIO()
+        try:
+            code = execute(program, argument, input_handle, output, errors)
+        except Exception as error:
+            errors.write('Error 99: Internal error %r\n' % error)
+        write_response(connection, code, output.getvalue().encode(errors='replace'),
+                       errors.getvalue().encode(errors='replace'))
+    finally:
+        os._exit(0)
+
+
+def serve(path, memory_limit):
+    """
+    Function running the daemon on Unix socket until it is interrupted or terminated. Requests are accepted one
+    by one, their programs run in parallel in forked processes
+    Input: path of the socket, limit of memory of cached programs in bytes
+    """
+    import socket
+    cache = ProgramCache(memory_limit)
+    if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+        os.unlink(path)  # Socket left by a daemon that was killed
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(64)
+    # Finished runs are reaped by the system, SIGTERM ends the daemon like ^C
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        while True:
+            connection, _ = server.accept()
+            with connection:
+                serve_request(connection, cache)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        os.unlink(path)
+
+
+def main():
+    try:
+        argument = argument_parse()
+        if argument.serve is not None:
+            serve(argument.serve, argument.serve_memory << 20)
+            return
+
+        #  handle input and source
+        if argument.src is not None:
+            try:
+                source_handle = open(argument.src, 'rb')
+            except FileNotFoundError:
+
+                error_exit(11, "Error 11: File " + argument.src + " does not exist")
+        else:
+            source_handle = sys.stdin.buffer
+
+        if argument.inp is None and source_handle == sys.stdin.buffer:
+            error_exit(56, "Err56: Missing file")
+        input_handle = open_input(argument.inp)
+
+        # Loading only allocates objects of the program, garbage collection would rescan them again and again
+        gc.disable()
+
+        # Parse and check source code or take it from cache
+        if argument.cache:
+            source = source_handle.read()
+            path = cache_path(argument.cache_dir, source, argument.source_format)
+            loaded = cache_load(path)
+            if loaded is None:
+                loaded = load_program(io.BytesIO(source), argument.source_format)
+                cache_store(path, loaded)
+        else:
+            loaded = load_program(source_handle, argument.source_format)
+        # Statistics are always collected on the program as it was written
+        program = Program(*loaded, () if argument.stats else argument.optimize)
+        gc.freeze()
+        gc.enable()
+    except ProgramExit as end:
+        sys.stderr.write(end.message + '\n')
+        sys.exit(end.code)
+
+    # Dump modes only print the program, all output of the program goes through one buffered writer
+    output = sys.stdout
+    if not argument.dump and not argument.dump_python:
+        output = open(sys.stdout.fileno(), 'w', buffering=max(argument.output_buffer, 2),
+                      encoding=sys.stdout.encoding, errors=sys.stdout.errors, closefd=False)
+    sys.exit(execute(program, argument, input_handle, output, sys.stderr))
+
+
+if __name__ == '__main__':
+    main()
@@ -535,6 +535,10 @@ while($file != NULL) {
         $outputFile = $srcFile."_tempOut.temp";
         $cmd = "python3.10 " . $flag_intScriptFile . " --source=" . $srcFile . ".src --input="
                 . $file->inFile->getName() . ".in";
+        // Options of the interpreter needed by the test
+        if(file_exists($srcFile.".opt")) {
+            $cmd = $cmd . " " . trim(file_get_contents($srcFile.".opt"));
+        }
         // Execute interpreter
         exec($cmd, $output, $rc);
         $output = implode("\n", $output);
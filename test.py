@@ -0,0 +1,276 @@
+import argparse  # command-line argument handling
+import html
+import importlib.util
+import io
+import json
+import os
+import shlex
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Interpreter module loaded once by every warm worker
+INTERPRET = None
+
+
+def argument_parse():
+    """
+    Function parsing arguments from commandline
+    Return: namespace with directory or zip of tests, interpreter, its options, number of workers and reports
+    """
+    parser = argparse.ArgumentParser(description='test.py ')
+    parser.add_argument('--directory=', action='store', dest='directory', default='.')
+    parser.add_argument('--recursive', action='store_true', dest='recursive')
+    parser.add_argument('--int-script=', action='store', dest='int_script', default='interpret.py')
+    parser.add_argument('--int-options=', action='store', dest='int_options', type=shlex.split, default=[])
+    parser.add_argument('--jobs=', action='store', dest='jobs', type=int, default=os.cpu_count())
+    parser.add_argument('--timeout=', action='store', dest='timeout', type=float, default=10)
+    parser.add_argument('--warm', action='store_true', dest='warm')
+    parser.add_argument('--json=', action='store', dest='json')
+    parser.add_argument('--html=', action='store', dest='html')
+    arguments = parser.parse_args()
+    if not os.path.exists(arguments.directory):
+        sys.stderr.write(arguments.directory + " not found\n")
+        sys.exit(41)
+    if not os.path.isfile(arguments.int_script):
+        sys.stderr.write(arguments.int_script + " not found\n")
+        sys.exit(41)
+    return arguments
+
+
+def find_tests(directory, recursive):
+    """
+    Function finding all tests (.src files) in a directory, only its subdirectories are searched with recursive
+    Input: directory, bool
+    Return: sorted list of paths of tests without extension
+    """
+    tests = list()
+    for path, directories, files in os.walk(directory):
+        tests.extend(os.path.join(path, file[:-4]) for file in files if file.endswith('.src'))
+        if not recursive:
+            break
+    return sorted(tests)
+
+
+def read_file(path, default):
+    """
+    Function reading content of a file of a test, missing file has default content
+    Input: path, default bytes
+    Return: bytes
+    """
+    try:
+        with open(path, 'rb') as file:
+            return file.read()
+    except FileNotFoundError:
+        return default
+
+
+def test_options(test):
+    """
+    Function reading options of the interpreter needed by a test, missing .opt has no options
+    Input: path of test without extension
+    Return: list of options
+    """
+    return shlex.split(read_file(test + '.opt', b'').decode())
+
+
+def expected(test):
+    """
+    Function reading expected output and return code of a test, missing .out is empty and missing .rc is 0
+    Input: path of test without extension
+    Return: touple of output and return code
+    """
+    output = read_file(test + '.out', b'').decode('utf-8', 'replace')
+    rc = read_file(test + '.rc', b'0').decode().strip() or '0'
+    return output, int(rc)
+
+
+def result(test, output, rc, elapsed):
+    """
+    Function comparing result of a test with expected one, trailing newlines of outputs are ignored
+    Input: path of test without extension, output, return code or None when the test timed out, wall time
+    Return: dictionary with the result
+    """
+    expected_output, expected_rc = expected(test)
+    return {
+        'test': test,
+        'ok': rc == expected_rc and output.rstrip('\n') == expected_output.rstrip('\n'),
+        'rc': rc,
+        'expected_rc': expected_rc,
+        'output': output,
+        'expected_output': expected_output,
+        'time': elapsed,
+    }
+
+
+def run_process(test, script, options, timeout):
+    """
+    Function running a test by a new process of the interpreter
+    Input: path of test without extension, interpreter, its options, timeout in seconds
+    Return: dictionary with the result
+    """
+    source = test + '.src'
+    input_file = test + '.in' if os.path.exists(test + '.in') else os.devnull
+    start = time.perf_counter()
+    try:
+        process = subprocess.run([sys.executable, script, '--source=' + source, '--input=' + input_file] + options
+                                 + test_options(test), stdin=subprocess.DEVNULL, capture_output=True, timeout=timeout)
+        output, rc = process.stdout.decode('utf-8', 'replace'), process.returncode
+    except subprocess.TimeoutExpired:
+        output, rc = '', None
+    return result(test, output, rc, time.perf_counter() - start)
+
+
+def warm_init(script):
+    """
+    Function loading the interpreter as a module once in every warm worker
+    Input: interpreter
+    """
+    global INTERPRET
+    # interpret.py imports interpret_core from its own directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    spec = importlib.util.spec_from_file_location('interpret', script)
+    INTERPRET = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(INTERPRET)
+
+
+def alarm(signum, frame):
+    """Signal handler stopping a test running too long in a warm worker"""
+    raise TimeoutError()
+
+
+def run_warm(test, script, options, timeout):
+    """
+    Function running a test in the warm worker through compile_program() and execute()
+    Input: path of test without extension, interpreter, its options, timeout in seconds
+    Return: dictionary with the result
+    """
+    source = read_file(test + '.src', b'')
+    input_text = read_file(test + '.in', b'').decode('utf-8', 'replace')
+    output = io.StringIO()
+    start = time.perf_counter()
+    signal.signal(signal.SIGALRM, alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        argument = INTERPRET.argument_parse(['--source=' + test + '.src'] + options + test_options(test))
+        program = INTERPRET.compile_program(source, () if argument.stats else argument.optimize,
+                                            argument.source_format)
+        rc = INTERPRET.execute(program, argument, input_text, output, io.StringIO())
+    except INTERPRET.ProgramExit as end:
+        rc = end.code
+    except TimeoutError:
+        rc = None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    return result(test, output.getvalue(), rc, time.perf_counter() - start)
+
+
+def run_tests(tests, arguments):
+    """
+    Function running tests across a pool of worker processes
+    Input: list of paths of tests without extension, namespace from argument_parse()
+    Return: list of results in order of tests
+    """
+    if arguments.warm:
+        pool = ProcessPoolExecutor(arguments.jobs, initializer=warm_init, initargs=(arguments.int_script,))
+        runner = run_warm
+    else:
+        pool = ProcessPoolExecutor(arguments.jobs)
+        runner = run_process
+    with pool:
+        futures = [pool.submit(runner, test, os.path.abspath(arguments.int_script), arguments.int_options,
+                               arguments.timeout) for test in tests]
+        return [future.result() for future in futures]
+
+
+def write_json(file, results, root, elapsed):
+    """
+    Function writing results as JSON
+    Input: file, list of results, directory of tests, wall time of whole run
+    """
+    passed = sum(1 for test in results if test['ok'])
+    report = {
+        'tests': len(results), 'passed': passed, 'failed': len(results) - passed, 'time': elapsed,
+        'results': [dict(test, test=os.path.relpath(test['test'], root)) for test in results],
+    }
+    with open(file, 'w') as json_file:
+        json.dump(report, json_file, indent=1)
+
+
+def write_html(file, results, root, elapsed):
+    """
+    Function writing results as HTML page, failed and passed tests are in tables by directories
+    Input: file, list of results, directory of tests, wall time of whole run
+    """
+    passed = sum(1 for test in results if test['ok'])
+    page = ['<!DOCTYPE html>\n<head>\n    <meta charset="UTF-8">\n'
+            '    <meta name="description" content="Test results">\n    <style>\n'
+            '    th, td { padding-left:10px; padding-right:10px; color:white; }\n'
+            '    h1,h2,h3,h4 { color:white; }\n'
+            '    textarea { background-color: rgb(18, 18, 18); color:white; }\n'
+            '    body { padding-left: 1em; padding-right: 1em; background-color: rgb(18, 18, 18); }\n'
+            '    </style>\n</head>\n\n<body>\n    <h1 style="text-align: center;">Test result</h1>\n'
+            '    <h2>Tests run: %d</h2>\n    <h2>Passed: %d</h2>\n    <h2>Failed: %d</h2>\n'
+            '    <h2>Time: %.2f s</h2>\n' % (len(results), passed, len(results) - passed, elapsed)]
+
+    for title, color, ok in (('Failed tests', 'red', False), ('Passed tests', 'green', True)):
+        page.append('<hr><h3 style="text-align: center; color:%s">%s</h3>' % (color, title))
+        directories = dict()
+        for test in results:
+            if test['ok'] == ok:
+                directories.setdefault(os.path.relpath(os.path.dirname(test['test']), root), []).append(test)
+        for directory, tests in directories.items():
+            page.append('<hr><h4>%s</h4><table>\n<tr><th>Test name</th><th>Time s</th><th>Return code</th>'
+                        '<th>Expected return code</th><th>Output</th><th>Expected output</th></tr>'
+                        % html.escape(directory))
+            for test in tests:
+                page.append('\n<tr><td>%s</td><td>%.3f</td><td>%s</td><td>%d</td>'
+                            '<td><textarea readonly rows=5 cols=50>%s</textarea></td>'
+                            '<td><textarea readonly rows=5 cols=50>%s</textarea></td></tr>\n' % (
+                                html.escape(os.path.basename(test['test'])), test['time'],
+                                'timeout' if test['rc'] is None else test['rc'], test['expected_rc'],
+                                html.escape(test['output']), html.escape(test['expected_output'])))
+            page.append('\n</table>\n')
+    page.append('</body></html>\n')
+
+    if file is None:
+        sys.stdout.write(''.join(page))
+    else:
+        with open(file, 'w') as html_file:
+            html_file.write(''.join(page))
+
+
+def main():
+    arguments = argument_parse()
+    with tempfile.TemporaryDirectory() as temp:
+        # Tests in zip are extracted, so both kinds of workers read them as files
+        root = arguments.directory
+        if zipfile.is_zipfile(root):
+            with zipfile.ZipFile(root) as archive:
+                archive.extractall(temp)
+            root = temp
+
+        tests = find_tests(root, arguments.recursive)
+        start = time.perf_counter()
+        results = run_tests(tests, arguments)
+        elapsed = time.perf_counter() - start
+
+        for test in results:
+            if not test['ok']:
+                sys.stderr.write('FAIL %s: rc %s (expected %d)\n' % (
+                    os.path.relpath(test['test'], root), test['rc'], test['expected_rc']))
+        passed = sum(1 for test in results if test['ok'])
+        sys.stderr.write('%d / %d passed in %.2f s\n' % (passed, len(results), elapsed))
+
+        if arguments.json is not None:
+            write_json(arguments.json, results, root, elapsed)
+        write_html(arguments.html, results, root, elapsed)
+    sys.exit(0 if passed == len(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
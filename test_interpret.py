@@ -0,0 +1,113 @@
+"""
+Regression tests of interpret.py through its library interface and of engines in interpret_core, for behaviour
+the tests in tests.zip can't see (timers of the caller, program counter after errors)
+
+Usage: python3 -m unittest test_interpret
+"""
+import io
+import os
+import signal
+import tempfile
+import time
+import unittest
+
+import interpret
+import interpret_core
+
+# Infinite loop, ended only by a limit or by a timer
+LOOP = b'.IPPcode23\nDEFVAR GF@i\nMOVE GF@i int@0\nLABEL loop\nADD GF@i GF@i int@1\nJUMP loop\n'
+
+
+class OuterAlarm(Exception):
+    """Raised by the SIGALRM handler of the caller"""
+
+
+def outer_alarm(signum, frame):
+    """SIGALRM handler of the caller"""
+    raise OuterAlarm()
+
+
+def guard_alarm(signum, frame):
+    """SIGVTALRM handler ending a loop whose alarm was lost"""
+    raise AssertionError('Timer of the caller was lost')
+
+
+class TimerTest(unittest.TestCase):
+    """
+    Runs with limits keep SIGALRM handler and timer of the caller
+    """
+    def setUp(self):
+        self.previous = signal.signal(signal.SIGALRM, outer_alarm)
+        self.guard = signal.signal(signal.SIGVTALRM, guard_alarm)
+        signal.setitimer(signal.ITIMER_VIRTUAL, 5)
+
+    def tearDown(self):
+        signal.setitimer(signal.ITIMER_VIRTUAL, 0)
+        signal.signal(signal.SIGVTALRM, self.guard)
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, self.previous)
+
+    def test_outer_alarm_fires_during_limited_run(self):
+        program = interpret.compile_program(LOOP, (), 'ippcode')
+        for engine in interpret.ENGINES:
+            with self.subTest(engine=engine):
+                signal.setitimer(signal.ITIMER_REAL, 0.2)
+                start = time.monotonic()
+                # Timeout of the limits is only a stop if the alarm of the caller is lost
+                with self.assertRaises(OuterAlarm):
+                    program.run('', io.StringIO(), io.StringIO(), engine,
+                                limits=interpret.Limits(max_memory=500, timeout=3))
+                self.assertLess(time.monotonic() - start, 1)
+
+    def test_outer_timer_kept_after_limited_run(self):
+        program = interpret.compile_program(b'.IPPcode23\nWRITE int@1\n', (), 'ippcode')
+        signal.setitimer(signal.ITIMER_REAL, 5, 2)
+        output = io.StringIO()
+        code = program.run('', output, io.StringIO(), limits=interpret.Limits(max_memory=500, timeout=1))
+        self.assertEqual((code, output.getvalue()), (0, '1'))
+        delay, interval = signal.getitimer(signal.ITIMER_REAL)
+        self.assertGreater(delay, 4)
+        self.assertEqual(interval, 2)
+        self.assertIs(signal.getsignal(signal.SIGALRM), outer_alarm)
+
+    def test_outer_timer_kept_by_sampling_profile(self):
+        program = interpret.compile_program(LOOP, (), 'ippcode')
+        with tempfile.TemporaryDirectory() as directory:
+            profile = os.path.join(directory, 'profile.txt')
+            signal.setitimer(signal.ITIMER_REAL, 0.2)
+            with self.assertRaises(OuterAlarm):
+                program.run('', io.StringIO(), io.StringIO(), profile=profile, profile_sample=1000)
+            with open(profile) as report:
+                self.assertIn('ADD', report.read())
+            self.assertIs(signal.getsignal(signal.SIGALRM), outer_alarm)
+
+            program = interpret.compile_program(b'.IPPcode23\nWRITE int@1\n', (), 'ippcode')
+            signal.setitimer(signal.ITIMER_REAL, 5, 2)
+            program.run('', io.StringIO(), io.StringIO(), profile=profile, profile_sample=1000)
+        delay, interval = signal.getitimer(signal.ITIMER_REAL)
+        self.assertGreater(delay, 4)
+        self.assertEqual(interval, 2)
+
+class SuperinstructionTest(unittest.TestCase):
+    """
+    Errors in a part of a superinstruction of --optimize=peephole point at that part
+    """
+    def test_error_on_second_operand(self):
+        program = interpret.compile_program(b'.IPPcode23\nDEFVAR GF@a\nPUSHS int@1\nPUSHS GF@b\nADDS\n',
+                                            ('peephole',), 'ippcode')
+        input_handle = interpret.InputReader(io.BytesIO(), 'utf-8')
+        memory = interpret_core.Memory(program.global_slots, program.local_slots, input_handle, io.StringIO(),
+                                       io.StringIO())
+        with self.assertRaises(interpret.ProgramExit) as error:
+            interpret_core.run_table(program.instruction_list, memory, program.optimize)
+        self.assertEqual((error.exception.code, error.exception.message), (54, 'Error 54: Non-existent var'))
+        # Message of a limit firing now names the second operand, not the first PUSHS
+        limits = interpret.Limits()
+        limits.instruction_list, limits.memory = program.instruction_list, memory
+        with self.assertRaises(interpret.ProgramExit) as error:
+            limits.exceeded(62, 'test', limits.locate(None))
+        self.assertEqual(error.exception.message, 'Error 62: Limit of test exceeded at order 3 (PUSHS GF@b)')
+
+
+if __name__ == '__main__':
+    unittest.main()